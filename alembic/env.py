@@ -18,9 +18,11 @@ if PROJECT_ROOT not in sys.path:
 from app.db.base import Base
 
 from app.models.user import User
-from app.models.logout import Logout
+from app.models.revoked_token import RevokedToken
 from app.models.blog import Blog
 from app.models.feedback import Feedback, View, Like
+from app.models.trending import TrendingScore, TrendingDirty
+from app.models.job_lease import JobLease
 
 
 # this is the Alembic Config object, which provides
@@ -43,6 +45,18 @@ if alembic_config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Full-text search objects are managed by migrations, not mapped on the models
+    if type_ == "column" and name == "search_vector":
+        return False
+    if type_ == "index" and name == "ix_blogs_search_vector":
+        return False
+    if type_ == "table" and name.startswith("blogs_fts"):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -65,6 +79,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -88,7 +103,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,29 @@
+"""blog image variants
+
+Revision ID: 0b6e4d2f8a35
+Revises: f3b8e2d5a914
+Create Date: 2026-10-18 00:21:37.615402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e4d2f8a35'
+down_revision: Union[str, Sequence[str], None] = 'f3b8e2d5a914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing images get variants from `python -m app.commands.backfill_image_variants`
+    op.add_column('blogs', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blogs', 'image_variants')
@@ -0,0 +1,35 @@
+"""blog reaction counters
+
+Revision ID: 5d2a8c4e9f13
+Revises: 3c9e1f7a2b4d
+Create Date: 2026-10-17 14:05:11.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8c4e9f13'
+down_revision: Union[str, Sequence[str], None] = '3c9e1f7a2b4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blogs', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('blogs', sa.Column('dislike_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE blogs SET
+            like_count = (SELECT count(*) FROM likes WHERE likes.blog_id = blogs.id AND likes.is_like),
+            dislike_count = (SELECT count(*) FROM likes WHERE likes.blog_id = blogs.id AND NOT likes.is_like)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blogs', 'dislike_count')
+    op.drop_column('blogs', 'like_count')
@@ -0,0 +1,45 @@
+"""pending image index
+
+Revision ID: 7c2e9a4d1b86
+Revises: 0b6e4d2f8a35
+Create Date: 2026-10-18 00:58:04.731926
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e9a4d1b86'
+down_revision: Union[str, Sequence[str], None] = '0b6e4d2f8a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+WHERE = {
+    'postgresql': 'image_url IS NOT NULL AND image_variants IS NULL AND is_deleted = false',
+    'sqlite': 'image_url IS NOT NULL AND image_variants IS NULL AND is_deleted = 0',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_blogs_pending_image', 'blogs', ['id'], unique=False, if_not_exists=True, postgresql_concurrently=True,
+                postgresql_where=sa.text(WHERE['postgresql'])
+            )
+    else:
+        op.create_index('ix_blogs_pending_image', 'blogs', ['id'], unique=False, sqlite_where=sa.text(WHERE['sqlite']))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_blogs_pending_image', table_name='blogs', if_exists=True, postgresql_concurrently=True)
+    else:
+        op.drop_index('ix_blogs_pending_image', table_name='blogs')
@@ -0,0 +1,61 @@
+"""blog excerpt and reading time
+
+Revision ID: 8e4b1f6c2a97
+Revises: 5d2a8c4e9f13
+Create Date: 2026-10-17 16:40:27.514302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import math
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b1f6c2a97'
+down_revision: Union[str, Sequence[str], None] = '5d2a8c4e9f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copies of app.services.blog_service.make_excerpt / estimate_reading_time
+def make_excerpt(content, length=200):
+    text = " ".join(content.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "…"
+
+
+def estimate_reading_time(content, words_per_minute=200):
+    return max(1, math.ceil(len(content.split()) / words_per_minute))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blogs', sa.Column('excerpt', sa.String(), nullable=True))
+    op.add_column('blogs', sa.Column('reading_time', sa.Integer(), server_default='1', nullable=False))
+
+    blogs = sa.table('blogs', sa.column('id', sa.Integer), sa.column('content', sa.Text), sa.column('excerpt', sa.String), sa.column('reading_time', sa.Integer))
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(blogs.c.id, blogs.c.content).where(blogs.c.id > last_id).order_by(blogs.c.id).limit(500)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            blogs.update().where(blogs.c.id == sa.bindparam('blog_id')),
+            [
+                {'blog_id': row.id, 'excerpt': make_excerpt(row.content), 'reading_time': estimate_reading_time(row.content)}
+                for row in rows
+            ]
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blogs', 'reading_time')
+    op.drop_column('blogs', 'excerpt')
@@ -0,0 +1,42 @@
+"""trending dirty queue and job leases
+
+Revision ID: 9a4c6e2b7d15
+Revises: 7c2e9a4d1b86
+Create Date: 2026-10-18 09:12:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c6e2b7d15'
+down_revision: Union[str, Sequence[str], None] = '7c2e9a4d1b86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Marks still held in worker memory at deploy time are covered by the next rebuild_trending run
+    op.create_table(
+        'trending_dirty',
+        sa.Column('blog_id', sa.Integer(), nullable=False),
+        sa.Column('marked_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['blog_id'], ['blogs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('blog_id')
+    )
+    op.create_table(
+        'job_leases',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_leases')
+    op.drop_table('trending_dirty')
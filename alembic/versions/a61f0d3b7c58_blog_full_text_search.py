@@ -0,0 +1,64 @@
+"""blog full text search
+
+Revision ID: a61f0d3b7c58
+Revises: 8e4b1f6c2a97
+Create Date: 2026-10-17 19:22:03.117845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a61f0d3b7c58'
+down_revision: Union[str, Sequence[str], None] = '8e4b1f6c2a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Rewrites blogs once to compute the stored column for existing rows
+        op.execute("""
+            ALTER TABLE blogs ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(content, '')), 'B')
+            ) STORED
+        """)
+        op.create_index('ix_blogs_search_vector', 'blogs', ['search_vector'], postgresql_using='gin')
+    elif dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE blogs_fts USING fts5(title, content, content='blogs', content_rowid='id')")
+        op.execute("""
+            CREATE TRIGGER blogs_fts_insert AFTER INSERT ON blogs BEGIN
+                INSERT INTO blogs_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER blogs_fts_delete AFTER DELETE ON blogs BEGIN
+                INSERT INTO blogs_fts (blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER blogs_fts_update AFTER UPDATE OF title, content ON blogs BEGIN
+                INSERT INTO blogs_fts (blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                INSERT INTO blogs_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+        """)
+        op.execute("INSERT INTO blogs_fts (blogs_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_blogs_search_vector', table_name='blogs')
+        op.drop_column('blogs', 'search_vector')
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER blogs_fts_update")
+        op.execute("DROP TRIGGER blogs_fts_delete")
+        op.execute("DROP TRIGGER blogs_fts_insert")
+        op.execute("DROP TABLE blogs_fts")
@@ -0,0 +1,44 @@
+"""blog trending scores
+
+Revision ID: d4f7a9c21e60
+Revises: a61f0d3b7c58
+Create Date: 2026-10-17 23:18:40.502113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f7a9c21e60'
+down_revision: Union[str, Sequence[str], None] = 'a61f0d3b7c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by `python -m app.commands.rebuild_trending` after deploying, then kept
+    # current by the refresh_trending / rebuild_trending jobs
+    op.create_table(
+        'blog_trending_scores',
+        sa.Column('blog_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['blog_id'], ['blogs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('blog_id')
+    )
+    op.create_index(
+        'ix_blog_trending_scores_score_blog_id',
+        'blog_trending_scores',
+        [sa.text('score DESC'), sa.text('blog_id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blog_trending_scores_score_blog_id', table_name='blog_trending_scores')
+    op.drop_table('blog_trending_scores')
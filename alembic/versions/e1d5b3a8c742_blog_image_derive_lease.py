@@ -0,0 +1,31 @@
+"""blog image derive lease
+
+Revision ID: e1d5b3a8c742
+Revises: 9a4c6e2b7d15
+Create Date: 2026-10-18 10:26:51.093644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1d5b3a8c742'
+down_revision: Union[str, Sequence[str], None] = '9a4c6e2b7d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Constant defaults: no table rewrite on PostgreSQL 11+
+    op.add_column('blogs', sa.Column('image_claimed_until', sa.DateTime(), nullable=True))
+    op.add_column('blogs', sa.Column('image_attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blogs', 'image_attempts')
+    op.drop_column('blogs', 'image_claimed_until')
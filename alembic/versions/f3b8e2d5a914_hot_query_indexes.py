@@ -0,0 +1,61 @@
+"""hot query indexes
+
+Revision ID: f3b8e2d5a914
+Revises: d4f7a9c21e60
+Create Date: 2026-10-17 23:52:11.204318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8e2d5a914'
+down_revision: Union[str, Sequence[str], None] = 'd4f7a9c21e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial index predicate per dialect)
+INDEXES = [
+    ('ix_blogs_visible_created_at', 'blogs', ['created_at', 'id'],
+     {'postgresql': 'is_deleted = false AND is_blocked = false', 'sqlite': 'is_deleted = 0 AND is_blocked = 0'}),
+    ('ix_blogs_author_created_at', 'blogs', ['author_id', 'created_at', 'id'],
+     {'postgresql': 'is_deleted = false', 'sqlite': 'is_deleted = 0'}),
+    ('ix_feedbacks_listed_blog_created_at', 'feedbacks', ['blog_id', 'created_at', 'id'],
+     {'postgresql': 'is_deleted = false AND is_listed = true', 'sqlite': 'is_deleted = 0 AND is_listed = 1'}),
+    ('ix_feedbacks_blog_id_id', 'feedbacks', ['blog_id', 'id'], None),
+    ('ix_feedbacks_user_id_blog_id', 'feedbacks', ['user_id', 'blog_id'], None),
+    ('ix_likes_blog_id_is_like', 'likes', ['blog_id', 'is_like'], None),
+    ('ix_views_blog_id', 'views', ['blog_id'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # CONCURRENTLY keeps the tables writable while the indexes build; it cannot run in a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in INDEXES:
+                op.create_index(
+                    name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True,
+                    postgresql_where=sa.text(where['postgresql']) if where else None
+                )
+    else:
+        for name, table, columns, where in INDEXES:
+            op.create_index(name, table, columns, unique=False, sqlite_where=sa.text(where['sqlite']) if where else None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in reversed(INDEXES):
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns, where in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
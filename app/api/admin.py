@@ -1,45 +1,58 @@
 from fastapi import APIRouter, Depends, UploadFile, Form, File
-from sqlalchemy.orm import Session
-from app.db.database import get_db
 from app.models.user import User
-from app.dependencies import get_current_admin as ca
-from app.services.admin_service import AdminService
+from app.dependencies import get_current_admin as ca, get_admin_service, get_read_admin_service
+from app.services.async_service import AsyncAdminService
+from app.core.metrics import metrics
+from app.schemas.admin_schema import BulkBlockUsers, BulkBlockBlogs, BulkFeedbackListed
 
 
 router = APIRouter()
 
 @router.get("/landing/")
-def get_landing_page(page: int = 1, page_size: int = 10, db: Session = Depends(get_db), current_user: User = Depends(ca)):
-    admin_service = AdminService(db)
-    return admin_service.admin_get_all_blogs(page, page_size)
+async def get_landing_page(page: int = 1, page_size: int = 10, fields: str = None, exact: bool = False, admin_service: AsyncAdminService = Depends(get_read_admin_service), current_user: User = Depends(ca)):
+    return await admin_service.admin_get_all_blogs(page, page_size, fields, exact)
 
 
 @router.get("/list-users/")
-def list_all_users(page: int = 1, page_size: int = 10, db: Session = Depends(get_db), current_admin: User = Depends(ca)):
-    admin_service = AdminService(db)
-    return admin_service.list_all_users(page, page_size)
+async def list_all_users(page: int = 1, page_size: int = 10, exact: bool = False, admin_service: AsyncAdminService = Depends(get_read_admin_service), current_admin: User = Depends(ca)):
+    return await admin_service.list_all_users(page, page_size, exact)
 
 
 @router.patch("/block-unblock-user/{user_id}")
-def block_unblock_user(user_id: int, db: Session = Depends(get_db), current_admin: User = Depends(ca)):
-    admin_service = AdminService(db)
-    return admin_service.block_unblock_user(user_id)
+async def block_unblock_user(user_id: int, admin_service: AsyncAdminService = Depends(get_admin_service), current_admin: User = Depends(ca)):
+    return await admin_service.block_unblock_user(user_id)
 
 
 @router.patch("/blogs/{blog_id}/block/")
-def block_blog(blog_id: int, db: Session = Depends(get_db), current_admin: User = Depends(ca)):
-    admin_service = AdminService(db)
-    return admin_service.block_unblock_blog(blog_id)
+async def block_blog(blog_id: int, admin_service: AsyncAdminService = Depends(get_admin_service), current_admin: User = Depends(ca)):
+    return await admin_service.block_unblock_blog(blog_id)
+
+
+@router.patch("/users/bulk-block/")
+async def bulk_block_users(data: BulkBlockUsers, admin_service: AsyncAdminService = Depends(get_admin_service), current_admin: User = Depends(ca)):
+    return await admin_service.bulk_block_users(data.ids, data.blocked)
+
+
+@router.patch("/blogs/bulk-block/")
+async def bulk_block_blogs(data: BulkBlockBlogs, admin_service: AsyncAdminService = Depends(get_admin_service), current_admin: User = Depends(ca)):
+    return await admin_service.bulk_block_blogs(data.ids, data.blocked)
+
+
+@router.patch("/feedbacks/bulk-listed/")
+async def bulk_set_feedback_listed(data: BulkFeedbackListed, admin_service: AsyncAdminService = Depends(get_admin_service), current_admin: User = Depends(ca)):
+    return await admin_service.bulk_set_feedback_listed(data.is_listed, data.ids, data.user_id, data.blog_id)
 
 
 @router.get("/feedbacks/{blog_id}/")
-def get_feedbacks(blog_id: int, page: int = 1, page_size: int = 10, db: Session = Depends(get_db), current_admin: User = Depends(ca)):
-    admin_service = AdminService(db)
-    return admin_service.get_feedbacks(blog_id, page, page_size)
+async def get_feedbacks(blog_id: int, page: int = 1, page_size: int = 10, exact: bool = False, admin_service: AsyncAdminService = Depends(get_read_admin_service), current_admin: User = Depends(ca)):
+    return await admin_service.get_feedbacks(blog_id, page, page_size, exact)
 
 
 @router.patch("/feedbacks/{feedback_id}/toggle/")
-def toggle_feedback_listed(feedback_id: int, db: Session = Depends(get_db), current_admin: User = Depends(ca)):
-    admin_service = AdminService(db)
-    return admin_service.toggle_feedback_listed(feedback_id)
+async def toggle_feedback_listed(feedback_id: int, admin_service: AsyncAdminService = Depends(get_admin_service), current_admin: User = Depends(ca)):
+    return await admin_service.toggle_feedback_listed(feedback_id)
+
 
+@router.get("/metrics/")
+def get_metrics(current_admin: User = Depends(ca)):
+    return metrics.snapshot()
@@ -1,46 +1,42 @@
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer
-from app.db.database import get_db
 from app.schemas.user_schema import UserRegister, Login
-from app.services.user_service import UserService
-from app.services.admin_service import AdminService
+from app.services.async_service import AsyncUserService, AsyncAdminService
 from app.models.user import User
-from app.dependencies import get_current_user as cu
+from app.dependencies import get_current_user as cu, get_user_service, get_admin_service
 
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 @router.post("/register/")
-def register_user(user: UserRegister, db: Session = Depends(get_db)):
-    user_service = UserService(db)
-    return user_service.register_user(user.dict())
+async def register_user(user: UserRegister, user_service: AsyncUserService = Depends(get_user_service)):
+    return await user_service.register_user(user.dict())
 
 
 @router.post("/login/")
-def login(user: Login, db: Session = Depends(get_db)):
-    user_service = UserService(db)
-    return user_service.login_user(user.email, user.password)
+async def login(user: Login, user_service: AsyncUserService = Depends(get_user_service)):
+    return await user_service.login_user(user.email, user.password)
 
 
 @router.post("/logout/")
-def logout(request: Request, db: Session = Depends(get_db),  current_user: User = Depends(cu)):
+async def logout(request: Request, user_service: AsyncUserService = Depends(get_user_service),  current_user: User = Depends(cu)):
     access_token = request.cookies.get("access_token")
     refresh_token = request.cookies.get('refresh_token')
-    user_service = UserService(db)
-    return user_service.logout_user(access_token, refresh_token, db, current_user.id)
+    return await user_service.logout_user(access_token, refresh_token, current_user.id)
+
+
+@router.post("/logout-all/")
+async def logout_all(user_service: AsyncUserService = Depends(get_user_service), current_user: User = Depends(cu)):
+    return await user_service.logout_all_sessions(current_user.id)
 
 
 @router.post("/admin/login/")
-def admin_login(user: Login, db: Session = Depends(get_db)):
-    admin_service = AdminService(db)
-    return admin_service.admin_login_user(user.email, user.password)
+async def admin_login(user: Login, admin_service: AsyncAdminService = Depends(get_admin_service)):
+    return await admin_service.admin_login_user(user.email, user.password)
 
 
 @router.post("/refresh/")
-def refresh_token(request: Request, db: Session = Depends(get_db)):
+async def refresh_token(request: Request, user_service: AsyncUserService = Depends(get_user_service)):
     token = request.cookies.get("refresh_token")
-    user_service = UserService(db)
-    return user_service.refresh_token(token, db)
-
+    return await user_service.refresh_token(token)
@@ -1,84 +1,96 @@
-from fastapi import APIRouter, Depends, UploadFile, Form, File
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.services.blog_service import BlogService
+from fastapi import APIRouter, Depends, UploadFile, Form, File, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.feed_cache import feed_cache
+from app.core.uploads import upload_path
+from app.services.async_service import AsyncBlogService
 from app.models.user import User
-from app.dependencies import get_current_user as cu
-from app.schemas.blog_schema import FeedbackCreate
+from app.dependencies import get_current_user as cu, get_blog_service, get_read_blog_service
+from app.schemas.blog_schema import FeedbackCreate, ImageUploadCreate, ImageUploadAttach
 
 
 router = APIRouter()
 
 @router.get("/landing/")
-def get_landing_page(page: int = 1, page_size: int = 10, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return {"blogs": blog_service.get_all_blogs(page, page_size)}
+async def get_landing_page(page: int = 1, page_size: int = 10, cursor: str = None, fields: str = None, sort: str = "latest", blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    body = feed_cache.get(page, page_size, cursor, fields, sort)
+    if body is None:
+        # Filled from the primary: a lagging replica would cache the pre-write page for the whole TTL.
+        # Sessions connect lazily, so hits never touch the database.
+        version, read_at = feed_cache.snapshot()
+        blogs = await blog_service.get_all_blogs(page, page_size, cursor, fields, sort)
+        body = JSONResponse(content=jsonable_encoder({"blogs": blogs})).body
+        feed_cache.set(page, page_size, cursor, fields, body, version, read_at, sort)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/blogs/search")
+async def search_blogs(q: str, page_size: int = 10, cursor: str = None, blog_service: AsyncBlogService = Depends(get_read_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.search_blogs(q, page_size, cursor)
 
 
 @router.get("/blog/{blog_id}/view/")
-def view_blog_detail(blog_id: int, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return {"blog": blog_service.view_blog_detail(blog_id, current_user.id)}
+async def view_blog_detail(blog_id: int, blog_service: AsyncBlogService = Depends(get_read_blog_service), current_user: User = Depends(cu)):
+    return {"blog": await blog_service.view_blog_detail(blog_id, current_user.id)}
 
 
 @router.post("/blogs/")
-async def create_blog(title: str = Form(...), content: str = Form(...), image: UploadFile = File(None), db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    image_data = await image.read() if image else None
-    return blog_service.create_blog(current_user.id, title, content, image_data)
+async def create_blog(title: str = Form(...), content: str = Form(...), image: UploadFile = File(None), blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    async with upload_path(image) as image_path:
+        return await blog_service.create_blog(current_user.id, title, content, image_path)
+
+
+@router.post("/blogs/uploads/")
+async def create_image_upload(upload: ImageUploadCreate, blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.create_image_upload(current_user.id, upload.content_type)
+
+
+@router.put("/blogs/{blog_id}/image")
+async def attach_uploaded_image(blog_id: int, upload: ImageUploadAttach, blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.attach_uploaded_image(blog_id, current_user.id, upload.key)
 
 
 @router.get("/blogs/")
-def list_user_blogs(page: int = 1, page_size: int = 10, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return {"blogs": blog_service.get_user_blogs(current_user.id, page, page_size)}
+async def list_user_blogs(page: int = 1, page_size: int = 10, cursor: str = None, fields: str = None, blog_service: AsyncBlogService = Depends(get_read_blog_service), current_user: User = Depends(cu)):
+    return {"blogs": await blog_service.get_user_blogs(current_user.id, page, page_size, cursor, fields)}
 
 
 @router.patch("/blogs/{blog_id}")
-async def edit_blog(blog_id: int, title: str = Form(None), content: str = Form(None), image: UploadFile = File(None), db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    image_data = await image.read() if image else None
-    return blog_service.edit_blog(blog_id, current_user.id, title, content, image_data)
+async def edit_blog(blog_id: int, title: str = Form(None), content: str = Form(None), image: UploadFile = File(None), blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    async with upload_path(image) as image_path:
+        return await blog_service.edit_blog(blog_id, current_user.id, title, content, image_path)
 
 
 @router.delete("/blogs/{blog_id}/delete/")
-def delete_blog(blog_id: int, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return blog_service.delete_blog(blog_id, current_user.id)
+async def delete_blog(blog_id: int, blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.delete_blog(blog_id, current_user.id)
 
 
 @router.patch("/blogs/{blog_id}/like")
-def like_or_unlike_blog(blog_id: int, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return blog_service.like_or_unlike_blog(blog_id, current_user.id)
+async def like_or_unlike_blog(blog_id: int, blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.like_or_unlike_blog(blog_id, current_user.id)
 
 
 @router.patch("/blogs/{blog_id}/dislike")
-def dislike_or_undislike_blog(blog_id: int, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return blog_service.dislike_or_undislike_blog(blog_id, current_user.id)
+async def dislike_or_undislike_blog(blog_id: int, blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.dislike_or_undislike_blog(blog_id, current_user.id)
 
 
 @router.get("/blogs/{blog_id}/feedbacks")
-def get_feedbacks(blog_id: int, page: int = 1, page_size: int = 10, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return blog_service.get_feedbacks(blog_id, current_user.id, page, page_size)
+async def get_feedbacks(blog_id: int, page: int = 1, page_size: int = 10, cursor: str = None, blog_service: AsyncBlogService = Depends(get_read_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.get_feedbacks(blog_id, current_user.id, page, page_size, cursor)
 
 
 @router.post("/blogs/{blog_id}/feedback")
-def create_feedback(blog_id: int, feedback: FeedbackCreate, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return blog_service.create_feedback(blog_id, current_user.id, feedback.comment)
+async def create_feedback(blog_id: int, feedback: FeedbackCreate, blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.create_feedback(blog_id, current_user.id, feedback.comment)
 
 
 @router.patch("/blogs/feedback/{feedback_id}")
-def edit_feedback(feedback_id: int, feedback: FeedbackCreate, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return blog_service.edit_feedback(feedback_id, current_user.id, feedback.comment)
+async def edit_feedback(feedback_id: int, feedback: FeedbackCreate, blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.edit_feedback(feedback_id, current_user.id, feedback.comment)
 
 
 @router.delete("/blogs/feedback/{feedback_id}/delete/")
-def delete_feedback(feedback_id: int, db: Session = Depends(get_db), current_user: User = Depends(cu)):
-    blog_service = BlogService(db)
-    return blog_service.delete_feedback(feedback_id, current_user.id)
-
+async def delete_feedback(feedback_id: int, blog_service: AsyncBlogService = Depends(get_blog_service), current_user: User = Depends(cu)):
+    return await blog_service.delete_feedback(feedback_id, current_user.id)
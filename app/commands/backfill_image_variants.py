@@ -0,0 +1,77 @@
+"""Generate WebP variants for blog images uploaded before the image pipeline.
+
+For every blog that has an ``image_url`` but no ``image_variants``, the stored
+original is downloaded and run through the same pipeline as new uploads. The
+blog then points at the new JPEG fallback and variants, and the original is
+deleted once the row is committed.
+
+    python -m app.commands.backfill_image_variants [--batch-size 100] [--limit N] [--dry-run]
+"""
+from sqlalchemy import select
+from app.core.images import image_pipeline
+from app.core.storage import storage
+from app.db.database import SessionLocal
+from app.models.blog import Blog
+import argparse, logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def backfill(db, batch_size: int = 100, limit: int = None, dry_run: bool = False):
+    converted = failed = 0
+    last_id = 0
+    while limit is None or converted + failed < limit:
+        blogs = db.execute(
+            select(Blog)
+            .where(Blog.id > last_id, Blog.image_url != None, Blog.image_variants == None)
+            .order_by(Blog.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not blogs:
+            break
+        last_id = blogs[-1].id
+        for blog in blogs:
+            if limit is not None and converted + failed >= limit:
+                break
+            if dry_run:
+                logger.info(f"Blog {blog.id}: would convert {blog.image_url}")
+                converted += 1
+                continue
+            original = blog.image_url
+            try:
+                blog.image_url, blog.image_variants = image_pipeline.process_stored(storage, f"blogs/{blog.author_id}", storage.key_for_url(original))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                failed += 1
+                logger.error(f"Blog {blog.id}: could not convert {original}: {getattr(e, 'detail', e)}")
+                continue
+            converted += 1
+            try:
+                storage.delete(storage.key_for_url(original))
+            except Exception as e:
+                logger.error(f"Blog {blog.id}: could not delete original {original}: {e}")
+    return converted, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate image variants for blogs uploaded before the image pipeline")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--limit", type=int, help="Stop after this many blogs")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the blogs that would be converted")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        converted, failed = backfill(db, args.batch_size, args.limit, args.dry_run)
+        action = "Would convert" if args.dry_run else "Converted"
+        print(f"{action} {converted} blog images, {failed} failed")
+    finally:
+        db.close()
+        image_pipeline.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare the old joined blog detail query with the current one on seeded data.
+
+Seeds one blog with ``--feedbacks`` comments and ``--likes`` reactions (one per
+user) and times both queries. Runs against a throwaway SQLite file unless
+``--database-url`` points at a scratch database; do not use a live one.
+
+    python -m app.commands.benchmark_blog_detail [--feedbacks 1000] [--likes 10000] [--repeat 5]
+"""
+from sqlalchemy import create_engine, func, case, insert
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.models.user import User
+from app.models.blog import Blog
+from app.models.feedback import Feedback, Like, View
+from app.models.revoked_token import RevokedToken  # noqa: F401 - registers the table for create_all
+from app.services.blog_service import BlogService
+import argparse, os, statistics, tempfile, time
+
+
+def seed(db, feedbacks: int, likes: int):
+    users = max(feedbacks, likes, 1)
+    db.execute(insert(User), [
+        {"full_name": f"Bench User {i}", "email": f"bench{i}@example.com", "password": "x"} for i in range(users)
+    ])
+    user_ids = [row.id for row in db.query(User.id).filter(User.email.like("bench%@example.com")).order_by(User.id)]
+    blog = Blog(author_id=user_ids[0], title=f"Benchmark {int(time.time())}", content="benchmark " * 500, excerpt="benchmark", reading_time=3)
+    db.add(blog)
+    db.flush()
+    db.execute(insert(Feedback), [{"blog_id": blog.id, "user_id": user_ids[i], "comment": f"comment {i}"} for i in range(feedbacks)])
+    db.execute(insert(Like), [{"blog_id": blog.id, "user_id": user_ids[i], "is_like": i % 4 != 0} for i in range(likes)])
+    blog.like_count = sum(1 for i in range(likes) if i % 4 != 0)
+    blog.dislike_count = likes - blog.like_count
+    db.commit()
+    return blog.id, user_ids[-1]
+
+
+def legacy_detail(db, blog_id: int):
+    # The detail query before it was rewritten: both joins fan out before GROUP BY
+    return (
+        db.query(
+            Blog,
+            func.count(case((Like.is_like == True, Like.id), else_=0)).label("like_count"),
+            func.count(case((Like.is_like == False, Like.id), else_=0)).label("dislike_count"),
+        )
+        .outerjoin(Feedback, Blog.id == Feedback.blog_id)
+        .outerjoin(Like, Blog.id == Like.blog_id)
+        .filter(Blog.id == blog_id, Blog.is_deleted == False, Blog.is_blocked == False)
+        .group_by(Blog.id)
+        .first()
+    )
+
+
+def timed(label: str, func, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<10} median {statistics.median(samples):9.2f} ms   min {min(samples):9.2f} ms   max {max(samples):9.2f} ms")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the blog detail query")
+    parser.add_argument("--database-url", help="Scratch database to seed (default: temporary SQLite file)")
+    parser.add_argument("--feedbacks", type=int, default=1000)
+    parser.add_argument("--likes", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = None
+    url = args.database_url
+    if not url:
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    try:
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            blog_id, viewer_id = seed(db, args.feedbacks, args.likes)
+            print(f"Seeded blog {blog_id} with {args.feedbacks} feedbacks and {args.likes} likes")
+            service = BlogService(db)
+            # Warm-up call so both sides are timed with a populated statement cache
+            service.view_blog_detail(blog_id, viewer_id)
+            legacy = timed("legacy", lambda: legacy_detail(db, blog_id), args.repeat)
+            current = timed("current", lambda: service.view_blog_detail(blog_id, viewer_id), args.repeat)
+            print(f"speedup    {legacy / current:.1f}x")
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
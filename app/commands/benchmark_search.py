@@ -0,0 +1,100 @@
+"""Time blog search on a seeded PostgreSQL corpus, with and without the candidate cap.
+
+Seeds ``--posts`` blogs whose words follow a skewed distribution, so the
+benchmark covers rare, medium and very common terms, then times one search
+page for each. PostgreSQL only (the FTS5 fallback is for local runs): point
+``--database-url`` at a scratch database; do not use a live one. Seeding a
+million posts takes a few minutes; rerun with ``--skip-seed`` to time again.
+
+    python -m app.commands.benchmark_search --database-url postgresql://... [--posts 1000000] [--repeat 5]
+"""
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.models.user import User
+from app.models.revoked_token import RevokedToken  # noqa: F401 - registers the table for create_all
+from app.core.config import SEARCH_MAX_CANDIDATES
+from app.core.search import PostgresSearch
+import argparse, statistics, time
+
+
+VOCABULARY_SIZE = 5000
+
+# Word n is roughly n^2 times rarer than word 0, so low numbers match most of the corpus
+SEED_SQL = text("""
+    INSERT INTO blogs (author_id, title, content, excerpt, reading_time, read_count, is_blocked, is_deleted, created_at, updated_at)
+    SELECT :author_id, 'Search bench ' || g, body, left(body, 100), 1, 0, false, false, now(), now()
+    FROM generate_series(:start, :stop) AS g
+    CROSS JOIN LATERAL (
+        SELECT string_agg('word' || floor(:vocabulary * power(random(), 3))::int, ' ') AS body
+        FROM generate_series(1, 80)
+        WHERE g IS NOT NULL
+    ) AS words
+""")
+
+QUERIES = {
+    "rare": "word4900",
+    "medium": "word400",
+    "common": "word1",
+    "two terms": "word1 word2",
+}
+
+
+def seed(db, posts: int, batch_size: int = 50000):
+    db.execute(insert(User).values(full_name="Search Bench", email=f"search.bench.{time.time_ns()}@example.com", password="x"))
+    author_id = db.execute(text("SELECT max(id) FROM users")).scalar()
+    for start in range(1, posts + 1, batch_size):
+        stop = min(posts, start + batch_size - 1)
+        db.execute(SEED_SQL, {"author_id": author_id, "start": start, "stop": stop, "vocabulary": VOCABULARY_SIZE})
+        db.commit()
+        print(f"Seeded {stop}/{posts} posts")
+    db.execute(text("ANALYZE blogs"))
+    db.commit()
+
+
+def timed(label: str, func, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<28} median {statistics.median(samples):9.2f} ms   min {min(samples):9.2f} ms   max {max(samples):9.2f} ms")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PostgreSQL blog search")
+    parser.add_argument("--database-url", required=True, help="Scratch PostgreSQL database to seed")
+    parser.add_argument("--posts", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--max-candidates", type=int, default=SEARCH_MAX_CANDIDATES)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse posts seeded by an earlier run")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        parser.error("search is only benchmarked on PostgreSQL")
+    try:
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            if not args.skip_seed:
+                seed(db, args.posts)
+            for label, q in QUERIES.items():
+                matches = db.execute(
+                    text("SELECT count(*) FROM blogs WHERE search_vector @@ websearch_to_tsquery('english', :q)"), {"q": q}
+                ).scalar()
+                print(f"{label} ({q!r}): {matches} matches")
+                for name, backend in (("capped", PostgresSearch(args.max_candidates)), ("uncapped", PostgresSearch(2 ** 31 - 1))):
+                    # Warm-up call so the index and the candidates' vectors are cached
+                    backend.search(db, q, args.page_size + 1)
+                    timed(f"  {name}", lambda: backend.search(db, q, args.page_size + 1), args.repeat)
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
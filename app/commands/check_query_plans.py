@@ -0,0 +1,244 @@
+"""Fail when a hot service query's plan falls back to a full table scan.
+
+Seeds users, blogs, feedbacks, likes and views, runs ANALYZE, then calls the
+service methods behind the hot endpoints while recording every statement
+they send. Each statement is EXPLAINed with its real parameters, and the run
+exits with status 1 if any plan reads one of the large tables sequentially
+(PostgreSQL ``Seq Scan``, SQLite ``SCAN <table>`` without an index). Run it
+after changing a query or an index. It uses a throwaway SQLite file unless
+``--database-url`` points at a scratch database. Do not use a live one,
+because the seed data is committed.
+
+    python -m app.commands.check_query_plans [--blogs 20000] [--feedbacks 50000] [--verbose]
+"""
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+from fastapi import HTTPException
+from app.db.base import Base
+from app.models.user import User
+from app.models.blog import Blog
+from app.models.feedback import Feedback, Like, View
+from app.models.revoked_token import RevokedToken  # noqa: F401 - registers the table for create_all
+from app.models.trending import TrendingScore  # noqa: F401 - registers the table for create_all
+from app.core.counts import counts
+from app.core.trending import trending
+from app.core.view_buffer import view_buffer
+from app.services.blog_service import BlogService
+from app.services.admin_service import AdminService
+import argparse, json, math, os, random, re, sys, tempfile
+
+
+# Tables large enough in production that a full scan on a request path is a regression
+LARGE_TABLES = {"users", "blogs", "feedbacks", "likes", "views", "blog_trending_scores"}
+
+
+def seed(db, users: int, blogs: int, feedbacks: int, reactions: int, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    db.execute(insert(User), [
+        {"full_name": f"Plan User {i}", "email": f"plan{i}@example.com", "password": "x", "is_admin": i == 0}
+        for i in range(users)
+    ])
+    user_ids = [row.id for row in db.query(User.id).order_by(User.id)]
+    db.execute(insert(Blog), [
+        {
+            "author_id": rng.choice(user_ids), "title": f"Plan check post {i}", "content": f"plan check body {i} " * 20,
+            "excerpt": f"plan check body {i}", "reading_time": 1, "read_count": 0,
+            "is_deleted": rng.random() < 0.05, "is_blocked": rng.random() < 0.02,
+            "created_at": now - timedelta(minutes=i), "updated_at": now - timedelta(minutes=i),
+        }
+        for i in range(blogs)
+    ])
+    blog_ids = [row.id for row in db.query(Blog.id).filter(Blog.is_deleted == False, Blog.is_blocked == False).order_by(Blog.id)]
+    # One busy blog so its feedback page is a real range scan
+    busy_blog_id = blog_ids[0]
+    db.execute(insert(Feedback), [
+        {
+            "blog_id": busy_blog_id if i % 10 == 0 else rng.choice(blog_ids), "user_id": rng.choice(user_ids),
+            "comment": f"comment {i}", "is_listed": rng.random() > 0.1, "is_deleted": rng.random() < 0.05,
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(feedbacks)
+    ])
+    pairs = rng.sample(range(len(user_ids) * len(blog_ids)), reactions)
+    db.execute(insert(Like), [
+        {"user_id": user_ids[pair // len(blog_ids)], "blog_id": blog_ids[pair % len(blog_ids)], "is_like": pair % 4 != 0}
+        for pair in pairs
+    ])
+    db.execute(insert(View), [
+        {"user_id": user_ids[pair // len(blog_ids)], "blog_id": blog_ids[pair % len(blog_ids)]}
+        for pair in pairs
+    ])
+    db.commit()
+    trending.rebuild(db)
+    db.execute(text("ANALYZE"))
+    db.commit()
+    author_id = db.query(Blog.author_id).filter(Blog.id == busy_blog_id).scalar()
+    return busy_blog_id, user_ids[-1], author_id, len(blog_ids)
+
+
+class StatementLog:
+    """Records the statements a block of service code sends, to EXPLAIN afterwards."""
+
+    def __init__(self, engine):
+        self.recording = False
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording and not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")):
+            self.statements.append((statement, parameters))
+
+
+    def capture(self, func):
+        self.statements = []
+        self.recording = True
+        try:
+            func()
+        finally:
+            self.recording = False
+        return self.statements
+
+
+def postgres_plan(connection, statement: str, parameters):
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    lines, full_scans = [], []
+
+    def walk(node, depth):
+        relation = node.get("Relation Name")
+        index = node.get("Index Name")
+        lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else "") + (f" using {index}" if index else ""))
+        if node["Node Type"] == "Seq Scan" and relation in LARGE_TABLES:
+            full_scans.append(relation)
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"], 0)
+    return lines, full_scans
+
+
+def sqlite_plan(connection, statement: str, parameters):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    lines = [row[3] for row in rows]
+    # A rowid-ordered walk that stops at the LIMIT (ORDER BY id, no sort step) is
+    # SQLite's equivalent of an index scan on the primary key
+    ordered_by_id = set(re.findall(r"ORDER BY (\w+)\.id\b(?:(?! LIMIT ).)* LIMIT ", statement, re.S))
+    if any(line.startswith("USE TEMP B-TREE") for line in lines):
+        ordered_by_id = set()
+    full_scans = []
+    for line in lines:
+        match = re.fullmatch(r"SCAN (\w+)(?: AS \w+)?", line)
+        if match and match.group(1) in LARGE_TABLES and match.group(1) not in ordered_by_id:
+            full_scans.append(match.group(1))
+    return lines, full_scans
+
+
+def deep_page(total: int, page_size: int = 10, target: int = 50):
+    """A far page (OFFSET paging) that still exists for ``total`` rows."""
+    return max(1, min(target, math.ceil(total / page_size)))
+
+
+def check_cases(db, log: StatementLog, cases: list, verbose: bool):
+    explain = postgres_plan if db.get_bind().dialect.name == "postgresql" else sqlite_plan
+    regressions = 0
+    for name, func in cases:
+        try:
+            statements = log.capture(func)
+        except HTTPException as e:
+            # A case that cannot run has no plan to trust; report it instead of crashing the check
+            print(f"{name:<28} FAILED {e.status_code} {e.detail}")
+            regressions += 1
+            db.rollback()
+            continue
+        for statement, parameters in statements:
+            lines, full_scans = explain(db.connection(), statement, parameters)
+            status = "FULL SCAN " + ", ".join(full_scans) if full_scans else "ok"
+            print(f"{name:<28} {status}")
+            if full_scans or verbose:
+                print("    " + " ".join(statement.split())[:300])
+                for line in lines:
+                    print(f"      {line}")
+            regressions += bool(full_scans)
+        db.rollback()
+    return regressions
+
+
+def hot_cases(db, users: int, feedbacks: int, busy_blog_id: int, viewer_id: int, author_id: int, visible_blogs: int):
+    """The service calls behind the hot endpoints, as ``(name, func)`` pairs for ``check_cases``."""
+    blogs = BlogService(db)
+    admin = AdminService(db)
+    # Listing totals are cached counts or planner estimates by design; check the page queries only
+    counts.store("admin.blogs", visible_blogs)
+    counts.store("admin.users", users)
+    counts.store(("admin.feedbacks", busy_blog_id), feedbacks // 10)
+    latest_cursor = blogs.get_all_blogs(page_size=50)["next_cursor"]
+    trending_cursor = blogs.get_all_blogs(page_size=50, sort="trending")["next_cursor"]
+    feedback_cursor = blogs.get_feedbacks(busy_blog_id, viewer_id)["next_cursor"]
+    db.rollback()
+
+    return [
+        ("landing latest", lambda: blogs.get_all_blogs()),
+        ("landing latest cursor", lambda: blogs.get_all_blogs(cursor=latest_cursor)),
+        ("landing trending", lambda: blogs.get_all_blogs(sort="trending")),
+        ("landing trending cursor", lambda: blogs.get_all_blogs(cursor=trending_cursor, sort="trending")),
+        ("my blogs", lambda: blogs.get_user_blogs(author_id)),
+        ("blog detail", lambda: blogs.view_blog_detail(busy_blog_id, viewer_id)),
+        ("feedback page cursor", lambda: blogs.get_feedbacks(busy_blog_id, viewer_id, cursor=feedback_cursor)),
+        ("search", lambda: blogs.search_blogs("plan check")),
+        ("like toggle", lambda: blogs.like_or_unlike_blog(busy_blog_id, viewer_id)),
+        ("create feedback", lambda: blogs.create_feedback(busy_blog_id, viewer_id, "plan check")),
+        ("flush views", lambda: view_buffer.flush(db)),
+        ("refresh trending", lambda: trending.refresh(db)),
+        ("derive uploaded images", lambda: blogs.derive_uploaded_images()),
+        ("admin blogs", lambda: admin.admin_get_all_blogs(page=deep_page(visible_blogs))),
+        ("admin users", lambda: admin.list_all_users(page=deep_page(users))),
+        ("admin feedbacks", lambda: admin.get_feedbacks(busy_blog_id)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot service queries and fail on full table scans")
+    parser.add_argument("--database-url", help="Scratch database to seed (default: temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--blogs", type=int, default=20000)
+    parser.add_argument("--feedbacks", type=int, default=50000)
+    parser.add_argument("--reactions", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not only regressions")
+    args = parser.parse_args()
+
+    path = None
+    url = args.database_url
+    if not url:
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    try:
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            busy_blog_id, viewer_id, author_id, visible_blogs = seed(
+                db, args.users, args.blogs, args.feedbacks, args.reactions, random.Random(args.seed)
+            )
+            print(f"Seeded {args.blogs} blogs, {args.feedbacks} feedbacks, {args.reactions} likes and views")
+            cases = hot_cases(db, args.users, args.feedbacks, busy_blog_id, viewer_id, author_id, visible_blogs)
+            regressions = check_cases(db, StatementLog(engine), cases, args.verbose)
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+    if regressions:
+        print(f"{regressions} statements read a large table without an index or could not run")
+        sys.exit(1)
+    print("All plans use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Recompute every blog's trending score into blog_trending_scores.
+
+Run once after the migration that adds the table, or after changing the
+TRENDING_* weights or half-life; the app's jobs only rescore blogs with new
+activity (and all blogs every TRENDING_REBUILD_SECONDS).
+
+    python -m app.commands.rebuild_trending
+"""
+from app.core.trending import trending
+from app.db.database import SessionLocal
+import logging
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        rescored = trending.rebuild(db)
+        print(f"Scored {rescored} visible blogs")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
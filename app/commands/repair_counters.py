@@ -0,0 +1,90 @@
+"""Recompute blogs.like_count / dislike_count from the likes table.
+
+The toggles keep the counters exact, but rows edited by hand or restored from a
+backup can leave them drifted. Only blogs whose stored counters differ are
+rewritten, in batches so a large table is not locked in one transaction.
+
+    python -m app.commands.repair_counters [--dry-run] [--batch-size 1000]
+"""
+from sqlalchemy import select, update, func, case
+from app.db.database import SessionLocal
+from app.models.blog import Blog
+from app.models.feedback import Like
+import argparse, logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def counter_batch(db, after_id: int, batch_size: int):
+    batch_ids = select(Blog.id).where(Blog.id > after_id).order_by(Blog.id).limit(batch_size).subquery()
+    batch_max = select(func.max(batch_ids.c.id)).scalar_subquery()
+    # Aggregate only the batch's id range (an index range on likes.blog_id), not the whole table
+    counts = (
+        select(
+            Like.blog_id,
+            func.sum(case((Like.is_like == True, 1), else_=0)).label("like_count"),
+            func.sum(case((Like.is_like == False, 1), else_=0)).label("dislike_count"),
+        )
+        .where(Like.blog_id > after_id, Like.blog_id <= batch_max)
+        .group_by(Like.blog_id)
+        .subquery()
+    )
+    like_count = func.coalesce(counts.c.like_count, 0)
+    dislike_count = func.coalesce(counts.c.dislike_count, 0)
+    return db.execute(
+        select(Blog.id, Blog.like_count, Blog.dislike_count, like_count.label("actual_likes"), dislike_count.label("actual_dislikes"))
+        .outerjoin(counts, counts.c.blog_id == Blog.id)
+        .where(Blog.id > after_id)
+        .order_by(Blog.id)
+        .limit(batch_size)
+    ).all()
+
+
+def repair_counters(db, batch_size: int = 1000, dry_run: bool = False):
+    repaired = 0
+    last_id = 0
+    while True:
+        rows = counter_batch(db, last_id, batch_size)
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            if (row.like_count, row.dislike_count) == (row.actual_likes, row.actual_dislikes):
+                continue
+            logger.warning(
+                f"Blog {row.id}: likes {row.like_count} -> {row.actual_likes}, dislikes {row.dislike_count} -> {row.actual_dislikes}"
+            )
+            repaired += 1
+            if not dry_run:
+                # Recount in the UPDATE itself so toggles committed since the scan are not overwritten
+                db.execute(
+                    update(Blog)
+                    .where(Blog.id == row.id)
+                    .values(
+                        like_count=select(func.count(Like.id)).where(Like.blog_id == Blog.id, Like.is_like == True).scalar_subquery(),
+                        dislike_count=select(func.count(Like.id)).where(Like.blog_id == Blog.id, Like.is_like == False).scalar_subquery(),
+                    )
+                )
+        db.commit()
+    return repaired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute drifted blog like/dislike counters")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Only report drifted blogs")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        repaired = repair_counters(db, args.batch_size, args.dry_run)
+        action = "Found" if args.dry_run else "Repaired"
+        print(f"{action} {repaired} blogs with drifted counters")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
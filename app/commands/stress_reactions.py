@@ -0,0 +1,102 @@
+"""Hammer the like/dislike toggles from many threads and check the counters.
+
+A small pool of users toggles reactions on one blog concurrently, so the same
+(user, blog) pair is regularly hit by overlapping requests. At the end the
+denormalized counters must match the likes table and no toggle may have failed.
+Runs against a throwaway SQLite file unless ``--database-url`` points at a
+scratch database; do not use a live one.
+
+    python -m app.commands.stress_reactions [--threads 16] [--toggles 200] [--users 8]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.models.user import User
+from app.models.blog import Blog
+from app.models.feedback import Like
+from app.models.revoked_token import RevokedToken  # noqa: F401 - registers the table for create_all
+from app.services.blog_service import BlogService
+import argparse, os, random, tempfile, time
+
+
+def seed(db, users: int):
+    db.execute(insert(User), [{"full_name": f"Stress User {i}", "email": f"stress{i}.{time.time_ns()}@example.com", "password": "x"} for i in range(users)])
+    user_ids = [row.id for row in db.query(User.id).order_by(User.id.desc()).limit(users)]
+    blog = Blog(author_id=user_ids[0], title=f"Stress {time.time_ns()}", content="stress", excerpt="stress", reading_time=1)
+    db.add(blog)
+    db.commit()
+    return blog.id, user_ids
+
+
+def worker(Session, blog_id: int, user_ids: list, toggles: int, seed_value: int):
+    rng = random.Random(seed_value)
+    failures = 0
+    db = Session()
+    service = BlogService(db)
+    try:
+        for _ in range(toggles):
+            user_id = rng.choice(user_ids)
+            try:
+                if rng.random() < 0.5:
+                    service.like_or_unlike_blog(blog_id, user_id)
+                else:
+                    service.dislike_or_undislike_blog(blog_id, user_id)
+            except HTTPException:
+                failures += 1
+    finally:
+        db.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency stress test for reaction toggles")
+    parser.add_argument("--database-url", help="Scratch database to seed (default: temporary SQLite file)")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--toggles", type=int, default=200, help="Toggles per thread")
+    parser.add_argument("--users", type=int, default=8)
+    args = parser.parse_args()
+
+    path = None
+    url = args.database_url
+    if not url:
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        url = f"sqlite:///{path}"
+    connect_args = {"timeout": 30} if url.startswith("sqlite") else {}
+    engine = create_engine(url, pool_size=args.threads, connect_args=connect_args)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    try:
+        Base.metadata.create_all(engine)
+        db = Session()
+        blog_id, user_ids = seed(db, args.users)
+        db.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            failures = sum(pool.map(
+                lambda i: worker(Session, blog_id, user_ids, args.toggles, i), range(args.threads)
+            ))
+        elapsed = time.perf_counter() - started
+        total = args.threads * args.toggles
+
+        db = Session()
+        blog = db.query(Blog.like_count, Blog.dislike_count).filter(Blog.id == blog_id).one()
+        likes = db.query(func.count(Like.id)).filter(Like.blog_id == blog_id, Like.is_like == True).scalar()
+        dislikes = db.query(func.count(Like.id)).filter(Like.blog_id == blog_id, Like.is_like == False).scalar()
+        db.close()
+
+        print(f"{total} toggles from {args.threads} threads in {elapsed:.2f} s ({total / elapsed:.0f}/s), {failures} failed")
+        print(f"counters likes={blog.like_count} dislikes={blog.dislike_count}; rows likes={likes} dislikes={dislikes}")
+        if failures or (blog.like_count, blog.dislike_count) != (likes, dislikes):
+            raise SystemExit("FAIL: toggles failed or counters drifted")
+        print("OK")
+    finally:
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
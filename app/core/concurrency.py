@@ -0,0 +1,138 @@
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from app.core.metrics import metrics
+import anyio.to_thread, asyncio, logging, threading, time
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_blocking(func, *args, **kwargs):
+    """Call blocking, non-database work (Pillow, S3, waiting on a process pool).
+
+    Sync services normally already run on a worker thread. Under the async
+    engine they run inside ``AsyncSession.run_sync`` on the event loop, so the
+    call is moved to the threadpool and awaited from the greenlet instead.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(func, *args, **kwargs))
+    return func(*args, **kwargs)
+
+
+def wait_for_future(future, timeout: float):
+    """Wait for a ``concurrent.futures`` result; on the event loop no thread is held while waiting."""
+    if in_greenlet():
+        try:
+            return await_only(asyncio.wait_for(asyncio.wrap_future(future), timeout))
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise TimeoutError()
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        # Drop the call from the executor queue too, or the slot it frees lets the backlog grow
+        future.cancel()
+        raise
+
+
+def size_threadpool(request_threads: int, *pools):
+    """Give the threadpool ``request_threads`` plus one thread per pending slot of ``pools``.
+
+    Callers waiting on a saturated process pool then cannot take the threads
+    ordinary requests need. Must run on the event loop (in the lifespan).
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = request_threads + sum(pool.max_pending for pool in pools)
+    logger.info(f"Threadpool sized to {limiter.total_tokens} threads")
+    return limiter.total_tokens
+
+
+class BoundedProcessPool:
+    """CPU-bound work in a dedicated process pool so it cannot starve the request threadpool.
+
+    At most ``max_pending`` calls may be queued or running; beyond that, and
+    when a call takes longer than ``timeout``, the caller gets a 503 with
+    ``Retry-After`` instead of waiting. Gauges and timings are reported under
+    ``name``.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int, timeout: float, retry_after: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor = None
+
+
+    def start(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+    def _busy(self):
+        return HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+    def _track(self, delta: int):
+        with self._lock:
+            self._pending += delta
+            metrics.set_gauge(f"{self.name}.pending", self._pending)
+            metrics.set_gauge(f"{self.name}.queued", max(0, self._pending - self.workers))
+
+
+    def run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            metrics.increment(f"{self.name}.rejected")
+            logger.warning(f"Process pool {self.name} is full, shedding request")
+            raise self._busy()
+        self._track(1)
+        started = time.perf_counter()
+        try:
+            future = self.start().submit(func, *args)
+            return wait_for_future(future, self.timeout)
+        except TimeoutError:
+            metrics.increment(f"{self.name}.timeouts")
+            raise self._busy()
+        finally:
+            self._track(-1)
+            self._slots.release()
+            metrics.observe(f"{self.name}.latency", time.perf_counter() - started)
+
+
+async def watch_event_loop(interval: float, threshold: float):
+    """Record how late the loop wakes up and warn when it was held past ``threshold``."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        metrics.observe("event_loop.lag", lag)
+        if lag > threshold:
+            logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms")
+
+
+def start_loop_monitor(threshold: float):
+    loop = asyncio.get_running_loop()
+    # asyncio's debug mode names the exact callback that exceeded the threshold
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold
+    return asyncio.create_task(watch_event_loop(min(threshold, 0.5), threshold), name="event_loop_monitor")
@@ -1,4 +1,4 @@
-from decouple import config
+from decouple import config, Csv
 
 
 DATABASE_URL = config("DATABASE_URL")
@@ -11,3 +11,113 @@ AWS_BUCKET_NAME = config("AWS_BUCKET_NAME")
 
 BASE_URL = config('BASE_URL')
 
+# Image storage: "s3", or "local" for an in-memory stub; one pooled S3 client per process
+STORAGE_BACKEND = config("STORAGE_BACKEND", default="s3")
+S3_MAX_POOL_CONNECTIONS = config("S3_MAX_POOL_CONNECTIONS", default=32, cast=int)
+S3_CONNECT_TIMEOUT_SECONDS = config("S3_CONNECT_TIMEOUT_SECONDS", default=3, cast=float)
+S3_READ_TIMEOUT_SECONDS = config("S3_READ_TIMEOUT_SECONDS", default=10, cast=float)
+S3_MAX_ATTEMPTS = config("S3_MAX_ATTEMPTS", default=3, cast=int)
+S3_RETRY_MODE = config("S3_RETRY_MODE", default="standard")
+# Managed transfers switch to multipart above the threshold; stored images (variants of uploads
+# capped at IMAGE_MAX_BYTES) stay below it, so they go up as single streamed PUTs
+S3_MULTIPART_THRESHOLD_BYTES = config("S3_MULTIPART_THRESHOLD_BYTES", default=8 * 1024 * 1024, cast=int)
+S3_MULTIPART_CHUNK_BYTES = config("S3_MULTIPART_CHUNK_BYTES", default=8 * 1024 * 1024, cast=int)
+
+
+# Revoked token cache
+REVOCATION_BLOOM_CAPACITY = config("REVOCATION_BLOOM_CAPACITY", default=100000, cast=int)
+REVOCATION_BLOOM_ERROR_RATE = config("REVOCATION_BLOOM_ERROR_RATE", default=0.001, cast=float)
+REVOCATION_CACHE_SIZE = config("REVOCATION_CACHE_SIZE", default=10000, cast=int)
+REVOCATION_SYNC_SECONDS = config("REVOCATION_SYNC_SECONDS", default=5, cast=int)
+REVOCATION_REBUILD_SECONDS = config("REVOCATION_REBUILD_SECONDS", default=3600, cast=int)
+# Ids below the high-water mark re-read on each sync; rows commit out of id order under concurrent logouts
+REVOCATION_SYNC_ID_MARGIN = config("REVOCATION_SYNC_ID_MARGIN", default=1000, cast=int)
+
+# Authenticated principal cache
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", default=10000, cast=int)
+PRINCIPAL_CACHE_TTL_SECONDS = config("PRINCIPAL_CACHE_TTL_SECONDS", default=30, cast=int)
+REVOCATION_PURGE_SECONDS = config("REVOCATION_PURGE_SECONDS", default=3600, cast=int)
+
+# Landing feed response cache
+FEED_CACHE_SIZE = config("FEED_CACHE_SIZE", default=1000, cast=int)
+FEED_CACHE_TTL_SECONDS = config("FEED_CACHE_TTL_SECONDS", default=60, cast=int)
+FEED_CACHE_COUNTS_MAX_AGE_SECONDS = config("FEED_CACHE_COUNTS_MAX_AGE_SECONDS", default=5, cast=int)
+
+# Full-text search (PostgreSQL): only the most recent matches are ranked
+SEARCH_MAX_CANDIDATES = config("SEARCH_MAX_CANDIDATES", default=5000, cast=int)
+
+# Admin listing totals: cached counts, planner estimates above the threshold (PostgreSQL)
+COUNT_CACHE_SIZE = config("COUNT_CACHE_SIZE", default=10000, cast=int)
+COUNT_CACHE_TTL_SECONDS = config("COUNT_CACHE_TTL_SECONDS", default=60, cast=int)
+COUNT_ESTIMATE_THRESHOLD = config("COUNT_ESTIMATE_THRESHOLD", default=100000, cast=int)
+
+# Write-behind buffer for blog views
+VIEW_BUFFER_SIZE = config("VIEW_BUFFER_SIZE", default=50000, cast=int)
+VIEW_FLUSH_SECONDS = config("VIEW_FLUSH_SECONDS", default=5, cast=float)
+VIEW_FLUSH_BATCH_SIZE = config("VIEW_FLUSH_BATCH_SIZE", default=1000, cast=int)
+
+# Trending feed: engagement weights, decay half-life and score refresh jobs
+TRENDING_HALF_LIFE_HOURS = config("TRENDING_HALF_LIFE_HOURS", default=24, cast=float)
+TRENDING_VIEW_WEIGHT = config("TRENDING_VIEW_WEIGHT", default=1, cast=float)
+TRENDING_LIKE_WEIGHT = config("TRENDING_LIKE_WEIGHT", default=5, cast=float)
+TRENDING_FEEDBACK_WEIGHT = config("TRENDING_FEEDBACK_WEIGHT", default=10, cast=float)
+TRENDING_BATCH_SIZE = config("TRENDING_BATCH_SIZE", default=1000, cast=int)
+TRENDING_REFRESH_SECONDS = config("TRENDING_REFRESH_SECONDS", default=30, cast=float)
+TRENDING_REBUILD_SECONDS = config("TRENDING_REBUILD_SECONDS", default=21600, cast=float)
+
+# Threads left for request handlers. Without DB_ASYNC every pending password hash or image
+# call holds a threadpool thread, so the pool is sized to this plus both MAX_PENDING caps at startup
+REQUEST_THREADS = config("REQUEST_THREADS", default=40, cast=int)
+
+# Password hashing pool
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+PASSWORD_HASH_MAX_PENDING = config("PASSWORD_HASH_MAX_PENDING", default=8, cast=int)
+PASSWORD_HASH_TIMEOUT_SECONDS = config("PASSWORD_HASH_TIMEOUT_SECONDS", default=10, cast=float)
+PASSWORD_HASH_RETRY_AFTER = config("PASSWORD_HASH_RETRY_AFTER", default=2, cast=int)
+
+# Image variant pool: resized WebP variants and a JPEG fallback per upload
+IMAGE_WORKERS = config("IMAGE_WORKERS", default=2, cast=int)
+IMAGE_MAX_PENDING = config("IMAGE_MAX_PENDING", default=8, cast=int)
+IMAGE_TIMEOUT_SECONDS = config("IMAGE_TIMEOUT_SECONDS", default=30, cast=float)
+IMAGE_RETRY_AFTER = config("IMAGE_RETRY_AFTER", default=5, cast=int)
+IMAGE_MAX_PIXELS = config("IMAGE_MAX_PIXELS", default=40_000_000, cast=int)
+IMAGE_WEBP_QUALITY = config("IMAGE_WEBP_QUALITY", default=80, cast=int)
+IMAGE_JPEG_QUALITY = config("IMAGE_JPEG_QUALITY", default=82, cast=int)
+IMAGE_MAX_BYTES = config("IMAGE_MAX_BYTES", default=5 * 1024 * 1024, cast=int)
+
+# Direct-to-storage image uploads: presigned POST, then a finalize call; variants are derived by a job
+IMAGE_UPLOAD_CONTENT_TYPES = config("IMAGE_UPLOAD_CONTENT_TYPES", default="image/jpeg,image/png,image/webp,image/gif", cast=Csv())
+IMAGE_UPLOAD_EXPIRES_SECONDS = config("IMAGE_UPLOAD_EXPIRES_SECONDS", default=300, cast=int)
+IMAGE_UPLOAD_DERIVE_SECONDS = config("IMAGE_UPLOAD_DERIVE_SECONDS", default=5, cast=float)
+IMAGE_UPLOAD_DERIVE_BATCH_SIZE = config("IMAGE_UPLOAD_DERIVE_BATCH_SIZE", default=20, cast=int)
+IMAGE_UPLOAD_DERIVE_MAX_ATTEMPTS = config("IMAGE_UPLOAD_DERIVE_MAX_ATTEMPTS", default=3, cast=int)
+# A claimed batch is retried by another worker after this long; covers a batch of IMAGE_TIMEOUT_SECONDS calls
+IMAGE_UPLOAD_DERIVE_LEASE_SECONDS = config("IMAGE_UPLOAD_DERIVE_LEASE_SECONDS", default=900, cast=int)
+# Uploads never attached to a blog are deleted once this old
+IMAGE_UPLOAD_ORPHAN_SECONDS = config("IMAGE_UPLOAD_ORPHAN_SECONDS", default=86400, cast=int)
+IMAGE_UPLOAD_CLEANUP_SECONDS = config("IMAGE_UPLOAD_CLEANUP_SECONDS", default=3600, cast=float)
+
+# Multipart image uploads: request body cap; without /proc the part is copied to UPLOAD_SPOOL_DIR (default system temp)
+UPLOAD_MAX_FORM_BYTES = config("UPLOAD_MAX_FORM_BYTES", default=1024 * 1024, cast=int)
+UPLOAD_CHUNK_BYTES = config("UPLOAD_CHUNK_BYTES", default=64 * 1024, cast=int)
+UPLOAD_SPOOL_DIR = config("UPLOAD_SPOOL_DIR", default=None)
+
+# Async database engine (asyncpg) for the service layer
+DB_ASYNC = config("DB_ASYNC", default=False, cast=bool)
+
+# Debug mode enables the event loop lag monitor
+DEBUG = config("DEBUG", default=False, cast=bool)
+LOOP_LAG_THRESHOLD_MS = config("LOOP_LAG_THRESHOLD_MS", default=100, cast=int)
+
+# Database connection pool
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+DB_POOL_WAIT_WARN_MS = config("DB_POOL_WAIT_WARN_MS", default=100, cast=int)
+DB_POOL_WARM_UP = config("DB_POOL_WARM_UP", default=True, cast=bool)
+
+# Read replicas; clients that just wrote are pinned to the primary for READ_YOUR_WRITES_SECONDS
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", default="", cast=Csv())
+READ_YOUR_WRITES_SECONDS = config("READ_YOUR_WRITES_SECONDS", default=5, cast=int)
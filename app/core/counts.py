@@ -0,0 +1,86 @@
+from sqlalchemy import func, text
+from sqlalchemy.orm import Query, Session
+from app.core.cache import TTLCache
+from app.core.config import COUNT_CACHE_SIZE, COUNT_CACHE_TTL_SECONDS, COUNT_ESTIMATE_THRESHOLD
+from app.core.metrics import metrics
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class Counts:
+    """Totals for paginated listings without a COUNT(*) on every page.
+
+    Counts are cached per listing key and dropped by the writes that change
+    them; the TTL bounds drift from other workers. On a miss PostgreSQL first
+    asks the planner (``EXPLAIN``, i.e. ``reltuples`` scaled by the filter's
+    selectivity) and only counts exactly when the estimate is below
+    ``estimate_threshold``, where an exact count is cheap anyway.
+    """
+
+    def __init__(self, max_size: int, ttl: float, estimate_threshold: int):
+        self.estimate_threshold = estimate_threshold
+        self._cache = TTLCache(max_size, ttl)
+
+
+    def count(self, db: Session, key, query: Query):
+        """Return ``(total, is_exact)`` for ``query`` (without LIMIT/OFFSET)."""
+        cached = self._cache.get(key)
+        if cached is not None:
+            metrics.increment("counts.hits")
+            return cached
+        metrics.increment("counts.misses")
+
+        query = query.order_by(None)
+        result = None
+        if db.get_bind().dialect.name == "postgresql":
+            estimate = self._estimate(db, query)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                metrics.increment("counts.estimates")
+                result = (estimate, False)
+        if result is None:
+            result = (query.count(), True)
+        self._cache.set(key, result)
+        return result
+
+
+    def _estimate(self, db: Session, query: Query):
+        statement = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+        try:
+            plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Could not estimate row count: {e}")
+            return None
+
+
+    def store(self, key, total: int):
+        self._cache.set(key, (total, True))
+
+
+    def invalidate(self, key):
+        self._cache.delete(key)
+
+
+    def fetch_page(self, db: Session, key, query: Query, offset: int, limit: int, exact: bool = False):
+        """Return ``(rows, total, is_exact)`` for one page of ``query``.
+
+        With ``exact`` the total comes from ``count(*) OVER ()`` on the page
+        query itself, so page and total still take a single round trip; it
+        also refreshes the cached count.
+        """
+        if exact:
+            rows = query.add_columns(func.count().over().label("total_count")).offset(offset).limit(limit).all()
+            if rows:
+                self.store(key, rows[0].total_count)
+                return rows, rows[0].total_count, True
+            # Past the last page the window has no row to report on
+            total, is_exact = self.count(db, key, query)
+            return rows, total, is_exact
+        rows = query.offset(offset).limit(limit).all()
+        total, is_exact = self.count(db, key, query)
+        return rows, total, is_exact
+
+
+counts = Counts(COUNT_CACHE_SIZE, COUNT_CACHE_TTL_SECONDS, COUNT_ESTIMATE_THRESHOLD)
@@ -0,0 +1,64 @@
+from app.core.cache import TTLCache
+from app.core.config import FEED_CACHE_SIZE, FEED_CACHE_TTL_SECONDS, FEED_CACHE_COUNTS_MAX_AGE_SECONDS
+from app.core.metrics import metrics
+import threading, time
+
+
+class FeedCache:
+    """Serialized landing feed pages, shared by every user.
+
+    Pages are keyed by ``(version, sort, page, page_size, cursor, fields)``. Creating, editing,
+    deleting or (un)blocking a blog bumps the version, so every cached page is
+    dropped at once and old entries simply age out of the LRU. Reactions only
+    change counters, so instead of flushing the cache on every like they cap the
+    age of pages built before the change at ``counts_max_age`` seconds.
+
+    The cache is per process: other workers converge within the TTL.
+    """
+
+    def __init__(self, max_size: int, ttl: float, counts_max_age: float):
+        self.counts_max_age = counts_max_age
+        self._pages = TTLCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self._version = 0
+        self._counts_changed_at = 0.0
+
+
+    @property
+    def version(self):
+        return self._version
+
+
+    def snapshot(self):
+        """``(version, read_at)`` to take before building a page and pass to ``set``."""
+        return self._version, time.monotonic()
+
+
+    def get(self, page: int, page_size: int, cursor: str = None, fields: str = None, sort: str = "latest"):
+        item = self._pages.get((self._version, sort, page, page_size, cursor, fields))
+        if item is not None:
+            body, stored_at = item
+            if stored_at >= self._counts_changed_at or time.monotonic() - stored_at < self.counts_max_age:
+                metrics.increment("feed_cache.hits")
+                return body
+        metrics.increment("feed_cache.misses")
+        return None
+
+
+    def set(self, page: int, page_size: int, cursor: str, fields: str, body: bytes, version: int, read_at: float, sort: str = "latest"):
+        # A page read before an invalidation is stored under the old version and never served.
+        # It is dated from before its query ran, so a reaction during the query still caps its age.
+        self._pages.set((version, sort, page, page_size, cursor, fields), (body, read_at))
+
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+        metrics.increment("feed_cache.invalidations")
+
+
+    def counts_changed(self):
+        self._counts_changed_at = time.monotonic()
+
+
+feed_cache = FeedCache(FEED_CACHE_SIZE, FEED_CACHE_TTL_SECONDS, FEED_CACHE_COUNTS_MAX_AGE_SECONDS)
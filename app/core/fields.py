@@ -0,0 +1,21 @@
+from fastapi import HTTPException
+
+
+def select_fields(fields: str, allowed: dict, default: tuple):
+    """Parse a ``fields=a,b,c`` query parameter into an ordered tuple of names.
+
+    ``allowed`` maps public field names to the columns that back them; unknown
+    names are rejected rather than silently dropped so typos are visible.
+    """
+    if not fields:
+        return default
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown or not names:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return names
+
+
+def query_columns(names: tuple, allowed: dict, required: tuple = ()):
+    """Columns to SELECT: the requested fields plus any the query itself needs (e.g. cursor keys)."""
+    return [allowed[name] for name in dict.fromkeys(names + required)]
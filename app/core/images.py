@@ -0,0 +1,118 @@
+from fastapi import HTTPException
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.core.config import (
+    IMAGE_WORKERS, IMAGE_MAX_PENDING, IMAGE_TIMEOUT_SECONDS, IMAGE_RETRY_AFTER,
+    IMAGE_MAX_PIXELS, IMAGE_WEBP_QUALITY, IMAGE_JPEG_QUALITY, UPLOAD_SPOOL_DIR
+)
+from app.core.concurrency import BoundedProcessPool, run_blocking
+import os, shutil, tempfile, uuid
+
+
+# Fixed widths for srcset; images narrower than a width are never upscaled
+IMAGE_VARIANT_WIDTHS = {"thumb": 320, "card": 800, "full": 1600}
+
+# Guards the worker processes against decompression bombs
+Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+
+
+def _resize(image: Image.Image, width: int):
+    if image.width <= width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def _encode(image: Image.Image, path: str, format: str, icc_profile: bytes, **options):
+    # Only the pixels and the ICC colour profile are written: EXIF, GPS and XMP are dropped
+    image.save(path, format, icc_profile=icc_profile, **options)
+    return path
+
+
+def render_variants(source_path: str, output_dir: str, widths: dict, webp_quality: int, jpeg_quality: int):
+    """Decode an upload and write its WebP variants and a JPEG ``fallback`` into ``output_dir``.
+
+    Runs in a worker process; images travel as file paths, never through the
+    pool's pipe. Returns ``{name: (path, width, height)}``. Raises
+    ``ValueError`` for anything Pillow cannot decode, including images over
+    ``Image.MAX_IMAGE_PIXELS``.
+    """
+    try:
+        with Image.open(source_path) as source:
+            source.seek(0)  # first frame of animated images
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ValueError(f"Uploaded file is not a valid image: {e}")
+    # The profile is kept only when it describes the RGB pixels being written
+    icc_profile = image.info.get("icc_profile") if image.mode in ("RGB", "RGBA", "P", "PA") else None
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    for name, width in widths.items():
+        resized = _resize(image, width)
+        path = _encode(resized, os.path.join(output_dir, f"{name}.webp"), "WEBP", icc_profile, quality=webp_quality, method=5)
+        variants[name] = (path, resized.width, resized.height)
+
+    # JPEG fallback for clients without WebP; transparency is flattened onto white
+    full = _resize(image, max(widths.values()))
+    if full.mode == "RGBA":
+        background = Image.new("RGB", full.size, "white")
+        background.paste(full, mask=full.getchannel("A"))
+        full = background
+    path = _encode(full, os.path.join(output_dir, "full.jpg"), "JPEG", icc_profile, quality=jpeg_quality, optimize=True, progressive=True)
+    variants["fallback"] = (path, full.width, full.height)
+    return variants
+
+
+class ImagePipeline(BoundedProcessPool):
+    """Derives the stored variants of a blog image in a dedicated process pool and uploads them."""
+
+    def process(self, storage, prefix: str, source_path: str):
+        """Store the variants of the image at ``source_path`` under ``prefix``; return ``(image_url, image_variants)``.
+
+        ``image_url`` is the JPEG fallback; ``image_variants`` maps each name
+        to its WebP ``url``, ``width`` and ``height`` for ``srcset``.
+        """
+        output_dir = tempfile.mkdtemp(prefix="variants-", dir=UPLOAD_SPOOL_DIR)
+        try:
+            try:
+                rendered = self.run(render_variants, source_path, output_dir, IMAGE_VARIANT_WIDTHS, IMAGE_WEBP_QUALITY, IMAGE_JPEG_QUALITY)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Uploaded file is not a valid image")
+
+            # A fresh directory per upload, so a replaced image never shares keys with the new one
+            directory = f"{prefix}/{uuid.uuid4().hex}"
+            image_url = run_blocking(storage.upload_file, f"{directory}/full.jpg", rendered.pop("fallback")[0], "image/jpeg")
+            variants = {}
+            for name, (path, width, height) in rendered.items():
+                url = run_blocking(storage.upload_file, f"{directory}/{name}.webp", path, "image/webp")
+                variants[name] = {"url": url, "width": width, "height": height}
+            return image_url, variants
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+
+    def process_stored(self, storage, prefix: str, key: str):
+        """``process`` for an object already in storage, downloaded to a temp file first.
+
+        The download happens in the calling (web worker) process, streamed to
+        disk rather than held in memory; only the resizing runs in the pool.
+        """
+        handle, path = tempfile.mkstemp(prefix="stored-", dir=UPLOAD_SPOOL_DIR)
+        os.close(handle)
+        try:
+            run_blocking(storage.download_file, key, path)
+            return self.process(storage, prefix, path)
+        finally:
+            os.remove(path)
+
+
+    def delete(self, storage, image_url: str, image_variants: dict = None):
+        """Remove a blog's stored image and its variants (images from before variants have none)."""
+        urls = [image_url] + [variant["url"] for variant in (image_variants or {}).values()]
+        for url in urls:
+            run_blocking(storage.delete, storage.key_for_url(url))
+
+
+image_pipeline = ImagePipeline("image_variants", IMAGE_WORKERS, IMAGE_MAX_PENDING, IMAGE_TIMEOUT_SECONDS, IMAGE_RETRY_AFTER)
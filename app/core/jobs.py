@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.db.dialect import dialect_insert
+from app.models.job_lease import JobLease
+import asyncio, logging
+
+
+logger = logging.getLogger(__name__)
+_jobs = []
+_tasks = []
+
+
+def register_job(name: str, interval_seconds: float, func, leased: bool = False):
+    """Run ``func(db)`` every ``interval_seconds`` while the app is serving.
+
+    Every worker runs every job; with ``leased`` only the first worker to
+    claim the job's lease runs it, once per ``interval_seconds`` in total.
+    """
+    _jobs.append((name, interval_seconds, func, interval_seconds if leased else None))
+
+
+def claim_lease(db: Session, name: str, seconds: float) -> bool:
+    """Take ``name`` for ``seconds`` unless another worker holds it; commits."""
+    now = datetime.now(timezone.utc)
+    db.execute(
+        dialect_insert(db, JobLease)
+        .values(name=name, expires_at=now - timedelta(seconds=1))
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    claimed = db.execute(
+        update(JobLease)
+        .where(JobLease.name == name, JobLease.expires_at <= now)
+        .values(expires_at=now + timedelta(seconds=seconds))
+    ).rowcount == 1
+    db.commit()
+    return claimed
+
+
+def run_job(name: str, func, lease_seconds: float = None):
+    db = SessionLocal()
+    try:
+        if lease_seconds is not None and not claim_lease(db, name, lease_seconds):
+            return
+        func(db)
+    except Exception as e:
+        logger.exception(f"Periodic job {name} failed: {e}")
+    finally:
+        db.close()
+
+
+async def _loop(name: str, interval_seconds: float, func, lease_seconds: float = None):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await run_in_threadpool(run_job, name, func, lease_seconds)
+
+
+def start_jobs():
+    for name, interval_seconds, func, lease_seconds in _jobs:
+        _tasks.append(asyncio.create_task(_loop(name, interval_seconds, func, lease_seconds), name=name))
+
+
+async def stop_jobs():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
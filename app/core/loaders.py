@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Session
+from app.models.user import User
+
+
+class UserNameLoader:
+    """Batch loader for user display names, scoped to one request's session.
+
+    Collect the ids a response needs and call ``load_many`` once; every id not
+    seen before in this request is fetched in a single ``IN`` query and later
+    lookups are served from memory.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._names = {}
+
+
+    def load_many(self, user_ids):
+        missing = {user_id for user_id in user_ids if user_id is not None and user_id not in self._names}
+        if missing:
+            rows = self.db.query(User.id, User.full_name).filter(User.id.in_(missing)).all()
+            self._names.update({row.id: row.full_name for row in rows})
+            # Remember unknown ids too so they are not queried again
+            self._names.update({user_id: None for user_id in missing - self._names.keys()})
+        return {user_id: self._names.get(user_id) for user_id in user_ids}
+
+
+    def load(self, user_id: int):
+        return self.load_many([user_id])[user_id]
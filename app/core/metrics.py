@@ -0,0 +1,42 @@
+import threading
+
+
+class Metrics:
+    """In-process counters, gauges and timings exposed on the admin metrics endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._timings = {}
+
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+
+    def set_gauge(self, name: str, value):
+        with self._lock:
+            self._gauges[name] = value
+
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            count, total, peak = self._timings.get(name, (0, 0.0, 0.0))
+            self._timings[name] = (count + 1, total + seconds, max(peak, seconds))
+
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": {
+                    name: {"count": count, "avg_ms": round(total / count * 1000, 3), "max_ms": round(peak * 1000, 3)}
+                    for name, (count, total, peak) in self._timings.items()
+                },
+            }
+
+
+metrics = Metrics()
@@ -0,0 +1,85 @@
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+import base64, json
+
+
+def _encode(values: list):
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: datetime, row_id: int):
+    return _encode([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_score_cursor(score: float, row_id: int):
+    return _encode([score, row_id])
+
+
+def decode_score_cursor(cursor: str):
+    try:
+        score, row_id = _decode(cursor)
+        return float(score), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, created_column, id_column, page: int, page_size: int, cursor: str = None):
+    """Apply newest-first keyset pagination on ``(created_at, id)``.
+
+    With a cursor the page starts right after the row it encodes, so deep pages
+    cost the same as the first one and do not shift when new rows arrive.
+    Without one, ``page`` falls back to OFFSET for older clients. One extra row
+    is fetched to know whether a next page exists; use ``next_cursor`` on the
+    returned rows.
+    """
+    query = query.order_by(created_column.desc(), id_column.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_column, id_column) < tuple_(created_at, row_id))
+    else:
+        query = query.offset((page - 1) * page_size)
+    return query.limit(page_size + 1).all()
+
+
+def next_cursor(rows: list, page_size: int):
+    """Trim the look-ahead row and return the cursor for the following page."""
+    if len(rows) <= page_size:
+        return None
+    del rows[page_size:]
+    return encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def paginate_by_score(query, score_column, id_column, page: int, page_size: int, cursor: str = None):
+    """Highest-score-first keyset pagination on ``(score, id)``; see ``paginate``.
+
+    The query must select the score labelled ``score`` for ``next_score_cursor``.
+    """
+    query = query.order_by(score_column.desc(), id_column.desc())
+    if cursor:
+        score, row_id = decode_score_cursor(cursor)
+        query = query.filter(tuple_(score_column, id_column) < tuple_(score, row_id))
+    else:
+        query = query.offset((page - 1) * page_size)
+    return query.limit(page_size + 1).all()
+
+
+def next_score_cursor(rows: list, page_size: int):
+    if len(rows) <= page_size:
+        return None
+    del rows[page_size:]
+    return encode_score_cursor(rows[-1].score, rows[-1].id)
@@ -0,0 +1,34 @@
+from passlib.context import CryptContext
+from app.core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_TIMEOUT_SECONDS, PASSWORD_HASH_RETRY_AFTER
+from app.core.concurrency import BoundedProcessPool
+
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str):
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str):
+    return pwd_context.verify(password, hashed_password)
+
+
+class PasswordHasher(BoundedProcessPool):
+    """Runs bcrypt in a dedicated process pool so it cannot starve the request threadpool."""
+
+    def hash(self, password: str):
+        return self.run(_hash, password)
+
+
+    def verify(self, password: str, hashed_password: str):
+        return self.run(_verify, password, hashed_password)
+
+
+password_hasher = PasswordHasher(
+    "password_hash",
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_TIMEOUT_SECONDS,
+    PASSWORD_HASH_RETRY_AFTER,
+)
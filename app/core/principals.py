@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
+from app.core.metrics import metrics
+from app.models.user import User
+import logging, select, threading
+
+
+logger = logging.getLogger(__name__)
+PRINCIPAL_CHANNEL = "principal_invalidated"
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    full_name: str
+    is_admin: bool
+    is_blocked: bool
+    token_version: int
+
+
+# Keyed by the JWT subject (email). Only used while this worker is listening
+# for invalidations from the others (PostgreSQL LISTEN/NOTIFY); otherwise
+# every request reads the principal from the table.
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+class PrincipalListener:
+    """Background thread evicting principals other workers have changed.
+
+    ``invalidate_principal`` sends a notification in the writer's transaction,
+    so every worker (including this one) receives it as soon as the block or
+    token version bump commits. While the listening connection is down the
+    cache is bypassed and cleared, since notifications may have been missed.
+    """
+
+    def __init__(self, reconnect_seconds: float = 1.0):
+        self.reconnect_seconds = reconnect_seconds
+        self.live = False
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+
+    def start(self, engine):
+        if engine.dialect.name != "postgresql":
+            logger.info("Principal cache disabled: cross-worker invalidation needs PostgreSQL")
+            return
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, args=(engine,), name="principal-listener", daemon=True)
+            self._thread.start()
+
+
+    def shutdown(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.reconnect_seconds + 1)
+            self._thread = None
+        self._set_live(False)
+
+
+    def evict(self, email: str):
+        with self._lock:
+            self.generation += 1
+            principal_cache.delete(email)
+
+
+    def store(self, email: str, principal: Principal, generation: int):
+        with self._lock:
+            # An invalidation that arrived while the row was read may describe a newer state
+            if self.live and self.generation == generation:
+                principal_cache.set(email, principal)
+
+
+    def _set_live(self, live: bool):
+        with self._lock:
+            self.generation += 1
+            principal_cache.clear()
+            self.live = live
+
+
+    def _run(self, engine):
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {PRINCIPAL_CHANNEL}")
+                self._set_live(True)
+                while not self._stopped.is_set():
+                    if select.select([dbapi_connection], [], [], self.reconnect_seconds) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        self.evict(dbapi_connection.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"Principal invalidation listener failed: {e}")
+                metrics.increment("principals.listener_errors")
+            finally:
+                self._set_live(False)
+                if connection is not None:
+                    # Never hand a LISTENing autocommit connection back to the pool
+                    connection.invalidate()
+                    connection.close()
+            self._stopped.wait(self.reconnect_seconds)
+
+
+principal_listener = PrincipalListener()
+
+
+def load_principal(db: Session, email: str):
+    generation = principal_listener.generation
+    if principal_listener.live:
+        principal = principal_cache.get(email)
+        if principal is not None:
+            return principal
+
+    row = (
+        db.query(User.id, User.email, User.full_name, User.is_admin, User.is_blocked, User.token_version)
+        .filter(User.email == email)
+        .first()
+    )
+    if not row:
+        return None
+    principal = Principal(
+        id=row.id,
+        email=row.email,
+        full_name=row.full_name,
+        is_admin=bool(row.is_admin),
+        is_blocked=bool(row.is_blocked),
+        token_version=row.token_version or 0,
+    )
+    principal_listener.store(email, principal, generation)
+    return principal
+
+
+def invalidate_principal(db: Session, email: str):
+    """Evict ``email`` from every worker's cache once the caller's transaction commits."""
+    principal_listener.evict(email)
+    if db.get_bind().dialect.name == "postgresql":
+        # Delivered on commit and dropped on rollback
+        db.execute(text("SELECT pg_notify(:channel, :email)"), {"channel": PRINCIPAL_CHANNEL, "email": email})
@@ -0,0 +1,115 @@
+from sqlalchemy import text, DateTime, Float, JSON
+from sqlalchemy.orm import Session
+from app.core.config import SEARCH_MAX_CANDIDATES
+from app.core.pagination import encode_score_cursor, decode_score_cursor
+import html, re
+
+# The database wraps matches in private-use sentinels; the snippet is HTML-escaped
+# before they become <mark> tags, so author content can never inject markup
+SNIPPET_START = "\ue000"
+SNIPPET_STOP = "\ue001"
+
+RESULT_COLUMNS = """
+    blogs.id, blogs.title, blogs.excerpt, blogs.reading_time, blogs.image_url, blogs.image_variants,
+    blogs.read_count, blogs.like_count, blogs.dislike_count, blogs.created_at
+"""
+
+
+class PostgresSearch:
+    """Ranked search over the generated, GIN-indexed ``blogs.search_vector``.
+
+    Ranks use the stored vector (title weighted above content); ``ts_headline``
+    is only evaluated for the rows on the returned page. Ranking reads every
+    candidate's vector, so only the ``max_candidates`` most recent matches are
+    ranked: a very common term costs the same as a moderately common one.
+    """
+
+    SQL = text(f"""
+        WITH query AS (SELECT websearch_to_tsquery('english', :q) AS q),
+        candidates AS (
+            SELECT blogs.id, blogs.search_vector
+            FROM blogs CROSS JOIN query
+            WHERE blogs.search_vector @@ query.q
+                AND blogs.is_deleted = false AND blogs.is_blocked = false
+            ORDER BY blogs.id DESC
+            LIMIT :max_candidates
+        ),
+        page AS (
+            SELECT candidates.id, ts_rank_cd(candidates.search_vector, query.q) AS score
+            FROM candidates CROSS JOIN query
+            -- ts_rank_cd returns real; comparing as real keeps ties on the cursor's score
+            WHERE CAST(:cursor_score AS real) IS NULL
+                OR (ts_rank_cd(candidates.search_vector, query.q), candidates.id)
+                    < (CAST(:cursor_score AS real), CAST(:cursor_id AS integer))
+            ORDER BY score DESC, candidates.id DESC
+            LIMIT :limit
+        )
+        SELECT {RESULT_COLUMNS}, page.score,
+            ts_headline('english', blogs.content, query.q,
+                'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxFragments=2, MaxWords=30, MinWords=10') AS snippet
+        FROM page JOIN blogs ON blogs.id = page.id CROSS JOIN query
+        ORDER BY page.score DESC, page.id DESC
+    """).columns(created_at=DateTime, score=Float, image_variants=JSON)
+
+
+    def __init__(self, max_candidates: int):
+        self.max_candidates = max_candidates
+
+
+    def search(self, db: Session, q: str, limit: int, cursor_score: float = None, cursor_id: int = None):
+        params = {"q": q, "limit": limit, "cursor_score": cursor_score, "cursor_id": cursor_id, "max_candidates": self.max_candidates}
+        return db.execute(self.SQL, params).all()
+
+
+class SqliteSearch:
+    """FTS5 fallback for local runs over the trigger-maintained ``blogs_fts`` table."""
+
+    SQL = text(f"""
+        SELECT {RESULT_COLUMNS}, -bm25(blogs_fts, 10.0, 1.0) AS score,
+            snippet(blogs_fts, 1, '{SNIPPET_START}', '{SNIPPET_STOP}', '…', 24) AS snippet
+        FROM blogs_fts JOIN blogs ON blogs.id = blogs_fts.rowid
+        WHERE blogs_fts MATCH :q
+            AND blogs.is_deleted = 0 AND blogs.is_blocked = 0
+            AND (:cursor_score IS NULL OR (-bm25(blogs_fts, 10.0, 1.0), blogs.id) < (:cursor_score, :cursor_id))
+        ORDER BY score DESC, blogs.id DESC
+        LIMIT :limit
+    """).columns(created_at=DateTime, score=Float, image_variants=JSON)
+
+
+    def search(self, db: Session, q: str, limit: int, cursor_score: float = None, cursor_id: int = None):
+        # Quote every term so user input is never parsed as FTS5 query syntax
+        terms = " ".join('"' + term.replace('"', '""') + '"' for term in re.findall(r"\w+", q))
+        if not terms:
+            return []
+        params = {"q": terms, "limit": limit, "cursor_score": cursor_score, "cursor_id": cursor_id}
+        return db.execute(self.SQL, params).all()
+
+
+def render_snippet(snippet: str):
+    """Escaped HTML for a result snippet, with only the matches wrapped in ``<mark>``."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_STOP, "</mark>")
+
+
+_backends = {"postgresql": PostgresSearch(SEARCH_MAX_CANDIDATES), "sqlite": SqliteSearch()}
+
+
+def search_backend(db: Session):
+    name = db.get_bind().dialect.name
+    if name not in _backends:
+        raise ValueError(f"Unsupported database dialect {name!r} for blog search; expected 'postgresql' or 'sqlite'")
+    return _backends[name]
+
+
+def search_blogs(db: Session, q: str, page_size: int, cursor: str = None):
+    """Return one page of ranked results and the cursor for the next one."""
+    cursor_score = cursor_id = None
+    if cursor:
+        cursor_score, cursor_id = decode_score_cursor(cursor)
+    rows = search_backend(db).search(db, q, page_size + 1, cursor_score, cursor_id)
+    cursor_for_next_page = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        cursor_for_next_page = encode_score_cursor(rows[-1].score, rows[-1].id)
+    return rows, cursor_for_next_page
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, timezone
+from app.core.config import SECRET_KEY
+import jwt, uuid
+
+
+access_token_expires = timedelta(minutes=15)
+refresh_token_expires = timedelta(days=30)
+
+
+def create_token(user, expires: timedelta, token_type: str = None):
+    claims = {
+        "sub": user.email,
+        "id": user.id,
+        "ver": user.token_version or 0,
+        "jti": uuid.uuid4().hex,
+        "exp": datetime.now(timezone.utc) + expires,
+    }
+    if token_type:
+        claims["type"] = token_type
+    return jwt.encode(claims, SECRET_KEY, algorithm="HS256")
+
+
+def issue_tokens(user):
+    return create_token(user, access_token_expires), create_token(user, refresh_token_expires, "refresh")
+
+
+def decode_token(token: str, verify_exp: bool = True):
+    payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"], options={"verify_exp": verify_exp})
+    # Tokens issued before token versioning carry neither claim and cannot be revoked
+    if not payload.get("jti") or "ver" not in payload:
+        raise jwt.InvalidTokenError("Token predates revocation support")
+    return payload
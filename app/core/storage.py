@@ -0,0 +1,227 @@
+from datetime import datetime, timezone
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from app.core.config import (
+    AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION, AWS_BUCKET_NAME, BASE_URL, STORAGE_BACKEND,
+    S3_MAX_POOL_CONNECTIONS, S3_CONNECT_TIMEOUT_SECONDS, S3_READ_TIMEOUT_SECONDS, S3_MAX_ATTEMPTS, S3_RETRY_MODE,
+    S3_MULTIPART_THRESHOLD_BYTES, S3_MULTIPART_CHUNK_BYTES
+)
+from app.core.metrics import metrics
+import boto3, logging, threading, time
+
+
+logger = logging.getLogger(__name__)
+
+
+class S3Storage:
+    """Blog images in S3 through one client shared by the whole process.
+
+    The client is created on first use, not per service. Creating it resolves
+    credentials and loads the endpoint model, which takes tens of milliseconds.
+    Sharing it lets every request reuse the keep-alive connections in its
+    pool. boto3 clients are thread-safe once built; only creation is locked.
+    """
+
+    def __init__(self, bucket: str, region: str, access_key: str, secret_key: str, config: Config, transfer: TransferConfig = None):
+        self.bucket = bucket
+        self.region = region
+        self.base_url = f"https://{bucket}.s3.{region}.amazonaws.com/"
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._config = config
+        self._transfer = transfer or TransferConfig()
+        self._client = None
+        self._lock = threading.Lock()
+
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    started = time.perf_counter()
+                    # A private session: boto3's default session is not thread-safe
+                    self._client = boto3.session.Session().client(
+                        "s3",
+                        aws_access_key_id=self._access_key,
+                        aws_secret_access_key=self._secret_key,
+                        region_name=self.region,
+                        config=self._config,
+                    )
+                    logger.info(f"Created S3 client in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return self._client
+
+
+    def url(self, key: str):
+        return self.base_url + key
+
+
+    def key_for_url(self, url: str):
+        return url.split(self.base_url)[-1]
+
+
+    def put(self, key: str, body: bytes, content_type: str, metadata: dict = None):
+        started = time.perf_counter()
+        try:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType=content_type, Metadata=metadata or {})
+        finally:
+            metrics.observe("storage.put", time.perf_counter() - started)
+        return self.url(key)
+
+
+    def upload_file(self, key: str, path: str, content_type: str):
+        """Stream a local file to ``key``; stored image variants stay under the multipart threshold, so this is one PUT."""
+        started = time.perf_counter()
+        try:
+            self.client.upload_file(path, self.bucket, key, ExtraArgs={"ContentType": content_type}, Config=self._transfer)
+        finally:
+            metrics.observe("storage.upload_file", time.perf_counter() - started)
+        return self.url(key)
+
+
+    def download_file(self, key: str, path: str):
+        started = time.perf_counter()
+        try:
+            self.client.download_file(self.bucket, key, path, Config=self._transfer)
+        finally:
+            metrics.observe("storage.download_file", time.perf_counter() - started)
+
+
+    def presign_upload(self, key: str, content_type: str, max_bytes: int, expires_in: int, metadata: dict = None):
+        """Presigned POST for a browser upload straight to the bucket; returns ``{"url", "fields"}``.
+
+        The policy pins the key, the content type, the ``x-amz-meta-*`` fields
+        and a size range, so S3 rejects anything else. Signing is local; no
+        request is sent.
+        """
+        fields = {"Content-Type": content_type, **{f"x-amz-meta-{name}": value for name, value in (metadata or {}).items()}}
+        conditions = [{name: value} for name, value in fields.items()] + [["content-length-range", 1, max_bytes]]
+        return self.client.generate_presigned_post(self.bucket, key, Fields=fields, Conditions=conditions, ExpiresIn=expires_in)
+
+
+    def head(self, key: str):
+        """``{"size", "content_type", "metadata"}`` of a stored object, or ``None`` if it does not exist."""
+        started = time.perf_counter()
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        finally:
+            metrics.observe("storage.head", time.perf_counter() - started)
+        return {"size": response["ContentLength"], "content_type": response.get("ContentType"), "metadata": response.get("Metadata", {})}
+
+
+    def list(self, prefix: str):
+        """``(key, last_modified)`` of every object under ``prefix``, fetched a page of 1000 at a time."""
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"], item["LastModified"]
+
+
+    def get(self, key: str):
+        started = time.perf_counter()
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        finally:
+            metrics.observe("storage.get", time.perf_counter() - started)
+
+
+    def delete(self, key: str):
+        started = time.perf_counter()
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=key)
+        finally:
+            metrics.observe("storage.delete", time.perf_counter() - started)
+
+
+class LocalStorage:
+    """In-memory stand-in for ``S3Storage`` for local runs and tests (``STORAGE_BACKEND=local``)."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/") + "/media/"
+        self.objects = {}
+        self.modified = {}
+        self._lock = threading.Lock()
+
+
+    def url(self, key: str):
+        return self.base_url + key
+
+
+    def key_for_url(self, url: str):
+        return url.split(self.base_url)[-1]
+
+
+    def put(self, key: str, body: bytes, content_type: str, metadata: dict = None):
+        with self._lock:
+            self.objects[key] = (body, content_type, metadata or {})
+            self.modified[key] = datetime.now(timezone.utc)
+        return self.url(key)
+
+
+    def upload_file(self, key: str, path: str, content_type: str):
+        with open(path, "rb") as source:
+            return self.put(key, source.read(), content_type)
+
+
+    def download_file(self, key: str, path: str):
+        with open(path, "wb") as target:
+            target.write(self.get(key))
+
+
+    def presign_upload(self, key: str, content_type: str, max_bytes: int, expires_in: int, metadata: dict = None):
+        # Nothing serves this form target locally; tests upload with ``put`` instead
+        fields = {"key": key, "Content-Type": content_type, **{f"x-amz-meta-{name}": value for name, value in (metadata or {}).items()}}
+        return {"url": self.base_url, "fields": fields}
+
+
+    def head(self, key: str):
+        if key not in self.objects:
+            return None
+        body, content_type, metadata = self.objects[key]
+        return {"size": len(body), "content_type": content_type, "metadata": metadata}
+
+
+    def list(self, prefix: str):
+        with self._lock:
+            return [(key, self.modified[key]) for key in self.objects if key.startswith(prefix)]
+
+
+    def get(self, key: str):
+        return self.objects[key][0]
+
+
+    def delete(self, key: str):
+        with self._lock:
+            self.objects.pop(key, None)
+            self.modified.pop(key, None)
+
+
+def create_storage(backend: str):
+    if backend == "local":
+        return LocalStorage(BASE_URL)
+    if backend == "s3":
+        return S3Storage(
+            AWS_BUCKET_NAME, AWS_REGION, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY,
+            Config(
+                max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                connect_timeout=S3_CONNECT_TIMEOUT_SECONDS,
+                read_timeout=S3_READ_TIMEOUT_SECONDS,
+                retries={"total_max_attempts": S3_MAX_ATTEMPTS, "mode": S3_RETRY_MODE},
+                tcp_keepalive=True,
+            ),
+            TransferConfig(multipart_threshold=S3_MULTIPART_THRESHOLD_BYTES, multipart_chunksize=S3_MULTIPART_CHUNK_BYTES),
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}; expected 's3' or 'local'")
+
+
+storage = create_storage(STORAGE_BACKEND)
+
+
+def get_storage():
+    """FastAPI dependency; override it (``app.dependency_overrides``) to swap in a ``LocalStorage``."""
+    return storage
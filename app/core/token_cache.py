@@ -0,0 +1,191 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from app.core.config import (
+    REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE, REVOCATION_CACHE_SIZE,
+    REVOCATION_SYNC_SECONDS, REVOCATION_REBUILD_SECONDS, REVOCATION_SYNC_ID_MARGIN
+)
+from app.core.security import refresh_token_expires
+from app.models.revoked_token import RevokedToken
+import hashlib, logging, math, threading, time
+
+
+logger = logging.getLogger(__name__)
+
+
+def token_digest(jti: str) -> bytes:
+    return hashlib.sha256(jti.encode()).digest()
+
+
+def to_timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+
+    def _positions(self, digest: bytes):
+        # Double hashing over two independent 64-bit slices of the SHA-256 digest
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+
+    def add(self, digest: bytes):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+
+    def __contains__(self, digest: bytes):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class RevokedTokenCache:
+    """Process-local view of the revoked_tokens table.
+
+    Every revoked ``jti`` that has not yet expired is in the Bloom filter, so a
+    negative answer never needs the database. The most recent revocations are
+    also kept in a bounded set that expires entries at the token's ``exp``; a
+    Bloom hit outside that set is confirmed with a single lookup. Revocations
+    made by other workers are picked up by an incremental sync every
+    ``REVOCATION_SYNC_SECONDS``. Ids are handed out before rows commit, so a
+    lower id can become visible after a higher one has been read; each sync
+    re-reads the last ``id_margin`` ids below the high-water mark to catch them.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, max_entries: int, sync_seconds: int, rebuild_seconds: int, id_margin: int = 0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_entries = max_entries
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.id_margin = id_margin
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._last_id = 0
+        self._synced_at = None
+        self._rebuilt_at = None
+
+
+    def revoke(self, jti: str, exp: float = None):
+        if not jti:
+            return
+        self._remember(token_digest(jti), exp)
+
+
+    def _remember(self, digest: bytes, exp: float = None):
+        expires_at = exp or time.time() + refresh_token_expires.total_seconds()
+        with self._lock:
+            self._bloom.add(digest)
+            self._entries[digest] = expires_at
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+    def is_revoked(self, db: Session, jti: str, exp: float = None) -> bool:
+        if not jti:
+            return False
+        self.sync(db)
+        digest = token_digest(jti)
+        if self._rebuilt_at is None:
+            # Still loading (or the load failed): answer from the table instead of waiting for it
+            return db.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+        with self._lock:
+            expires_at = self._entries.get(digest)
+            if expires_at is not None:
+                if expires_at > time.time():
+                    return True
+                del self._entries[digest]
+            if digest not in self._bloom:
+                return False
+
+        # Bloom hit without a live entry: either evicted from the set or a false positive
+        revoked = db.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+        if revoked:
+            self._remember(digest, exp)
+        return revoked
+
+
+    def sync(self, db: Session, force: bool = False):
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_seconds:
+            return
+        # Only one caller refreshes and nobody waits for it: under the async engine this
+        # runs on the event loop thread, and blocking here while the holder is suspended
+        # in a query would deadlock the loop. The others answer from the current state.
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if not force and self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_seconds:
+                return
+            if self._rebuilt_at is None or now - self._rebuilt_at >= self.rebuild_seconds:
+                self._rebuild(db)
+                self._rebuilt_at = now
+            else:
+                rows = (
+                    db.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                    .filter(RevokedToken.id > max(0, self._last_id - self.id_margin))
+                    .order_by(RevokedToken.id)
+                    .all()
+                )
+                for row in rows:
+                    digest = token_digest(row.jti)
+                    if row.id <= self._last_id and digest in self._bloom:
+                        continue
+                    self._remember(digest, to_timestamp(row.expires_at))
+                    self._last_id = max(self._last_id, row.id)
+            self._synced_at = now
+        except Exception as e:
+            logger.error(f"Failed to sync revoked token cache: {e}")
+        finally:
+            self._sync_lock.release()
+
+
+    def _rebuild(self, db: Session):
+        # Bloom filters cannot forget, so expired revocations are dropped by rebuilding
+        last_id = db.query(RevokedToken.id).order_by(RevokedToken.id.desc()).limit(1).scalar() or 0
+        rows = (
+            db.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+            .filter(RevokedToken.expires_at > datetime.now(timezone.utc))
+            .order_by(RevokedToken.id)
+            .all()
+        )
+        bloom = BloomFilter(max(self.capacity, len(rows)), self.error_rate)
+        entries = OrderedDict()
+        now = time.time()
+        for row in rows:
+            last_id = max(last_id, row.id)
+            digest = token_digest(row.jti)
+            bloom.add(digest)
+            entries[digest] = to_timestamp(row.expires_at)
+        with self._lock:
+            # Keep revocations recorded locally while the rows were being read
+            for digest, expires_at in self._entries.items():
+                if expires_at > now:
+                    bloom.add(digest)
+                    entries[digest] = expires_at
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._bloom = bloom
+            self._entries = entries
+            self._last_id = last_id
+        logger.info(f"Rebuilt revoked token cache with {len(entries)} live entries")
+
+
+revoked_tokens = RevokedTokenCache(
+    REVOCATION_BLOOM_CAPACITY,
+    REVOCATION_BLOOM_ERROR_RATE,
+    REVOCATION_CACHE_SIZE,
+    REVOCATION_SYNC_SECONDS,
+    REVOCATION_REBUILD_SECONDS,
+    REVOCATION_SYNC_ID_MARGIN,
+)
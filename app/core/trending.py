@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+from app.core.config import (
+    TRENDING_HALF_LIFE_HOURS, TRENDING_VIEW_WEIGHT, TRENDING_LIKE_WEIGHT, TRENDING_FEEDBACK_WEIGHT, TRENDING_BATCH_SIZE
+)
+from app.core.metrics import metrics
+from app.db.dialect import dialect_insert
+from app.models.blog import Blog
+from app.models.feedback import Feedback
+from app.models.trending import TrendingScore, TrendingDirty
+import logging, math, time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingScores:
+    """Time-decayed trending rank, precomputed into ``blog_trending_scores``.
+
+    A blog's trending value is its weighted engagement (views, likes, listed
+    feedbacks) halved every ``half_life_hours`` since it was posted. Ranking by
+    the log of that value, ``log2(1 + engagement) + posted_at / half_life``,
+    gives the same order at any moment, so a stored score only goes stale when
+    the blog's own counts change: writes ``mark`` the blog in ``trending_dirty``
+    within their own transaction, and ``refresh`` (a periodic job in every
+    worker) claims marked blogs and rescores them in batches of one aggregate
+    query and one upsert. ``rebuild`` rescores every blog, for changed weights.
+    """
+
+    def __init__(self, half_life_hours: float, view_weight: float, like_weight: float, feedback_weight: float, batch_size: int):
+        self.half_life_seconds = half_life_hours * 3600
+        self.view_weight = view_weight
+        self.like_weight = like_weight
+        self.feedback_weight = feedback_weight
+        self.batch_size = batch_size
+
+
+    def mark(self, db: Session, *blog_ids: int):
+        """Queue blogs for rescoring; call before the change commits so both commit together."""
+        if not blog_ids:
+            return
+        now = datetime.now(timezone.utc)
+        db.execute(
+            dialect_insert(db, TrendingDirty)
+            .values([{"blog_id": blog_id, "marked_at": now} for blog_id in sorted(set(blog_ids))])
+            .on_conflict_do_nothing(index_elements=["blog_id"])
+        )
+
+
+    def score(self, posted_at: datetime, views: int, likes: int, feedbacks: int):
+        engagement = self.view_weight * (views or 0) + self.like_weight * (likes or 0) + self.feedback_weight * (feedbacks or 0)
+        if posted_at.tzinfo is None:
+            posted_at = posted_at.replace(tzinfo=timezone.utc)
+        return math.log2(1 + max(engagement, 0)) + posted_at.timestamp() / self.half_life_seconds
+
+
+    def _rescore(self, db: Session, blog_ids: list):
+        feedbacks = (
+            select(Feedback.blog_id, func.count(Feedback.id).label("feedbacks"))
+            .where(Feedback.blog_id.in_(blog_ids), Feedback.is_deleted == False, Feedback.is_listed == True)
+            .group_by(Feedback.blog_id)
+            .subquery()
+        )
+        rows = db.execute(
+            select(Blog.id, Blog.created_at, Blog.read_count, Blog.like_count, Blog.is_deleted, Blog.is_blocked, feedbacks.c.feedbacks)
+            .outerjoin(feedbacks, feedbacks.c.blog_id == Blog.id)
+            .where(Blog.id.in_(blog_ids))
+        ).all()
+
+        now = datetime.now(timezone.utc)
+        scores = [
+            {"blog_id": row.id, "score": self.score(row.created_at or now, row.read_count, row.like_count, row.feedbacks), "computed_at": now}
+            for row in rows if not row.is_deleted and not row.is_blocked
+        ]
+        scored = {item["blog_id"] for item in scores}
+        removed = [blog_id for blog_id in blog_ids if blog_id not in scored]
+        if scores:
+            statement = dialect_insert(db, TrendingScore).values(scores)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=["blog_id"],
+                set_={"score": statement.excluded.score, "computed_at": statement.excluded.computed_at},
+            ))
+        if removed:
+            # Deleted and blocked blogs leave the ranking instead of being filtered per request
+            db.execute(delete(TrendingScore).where(TrendingScore.blog_id.in_(removed)))
+        db.commit()
+        return len(scores)
+
+
+    def _claim(self, db: Session):
+        # Workers refreshing at the same time skip each other's rows instead of waiting (PostgreSQL)
+        claimed = (
+            select(TrendingDirty.blog_id)
+            .order_by(TrendingDirty.blog_id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return sorted(db.execute(
+            delete(TrendingDirty).where(TrendingDirty.blog_id.in_(claimed)).returning(TrendingDirty.blog_id)
+        ).scalars())
+
+
+    def refresh(self, db: Session):
+        started = time.monotonic()
+        rescored = 0
+        try:
+            while True:
+                # The marks are deleted in the rescoring transaction: a failed batch puts them back
+                batch = self._claim(db)
+                if not batch:
+                    db.rollback()
+                    break
+                self._rescore(db, batch)
+                rescored += len(batch)
+                if len(batch) < self.batch_size:
+                    break
+        except Exception:
+            db.rollback()
+            raise
+
+        if rescored:
+            metrics.increment("trending.rescored", rescored)
+            metrics.observe("trending.refresh", time.monotonic() - started)
+            logger.debug(f"Rescored {rescored} trending blogs")
+        return rescored
+
+
+    def rebuild(self, db: Session):
+        started = time.monotonic()
+        rescored = 0
+        last_id = 0
+        while True:
+            blog_ids = db.execute(
+                select(Blog.id).where(Blog.id > last_id).order_by(Blog.id).limit(self.batch_size)
+            ).scalars().all()
+            if not blog_ids:
+                break
+            last_id = blog_ids[-1]
+            rescored += self._rescore(db, blog_ids)
+
+        metrics.observe("trending.rebuild", time.monotonic() - started)
+        logger.info(f"Rebuilt trending scores for {rescored} blogs in {time.monotonic() - started:.1f} s")
+        return rescored
+
+
+trending = TrendingScores(
+    TRENDING_HALF_LIFE_HOURS, TRENDING_VIEW_WEIGHT, TRENDING_LIKE_WEIGHT, TRENDING_FEEDBACK_WEIGHT, TRENDING_BATCH_SIZE
+)
@@ -0,0 +1,144 @@
+from contextlib import asynccontextmanager
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from app.core.config import IMAGE_MAX_BYTES, IMAGE_UPLOAD_CONTENT_TYPES, UPLOAD_MAX_FORM_BYTES, UPLOAD_CHUNK_BYTES, UPLOAD_SPOOL_DIR
+from app.core.metrics import metrics
+import logging, os, shutil, tempfile
+
+
+logger = logging.getLogger(__name__)
+
+
+# Leading bytes of the formats the image pipeline accepts
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def sniff_image_type(head: bytes):
+    """Content type from an upload's first bytes (the client's declared type is ignored), or ``None``."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def _check(source, max_bytes: int):
+    # Starlette has already spooled the part (in memory up to 1 MB, then to disk): check it in place
+    size = source.seek(0, os.SEEK_END)
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    if size > max_bytes:
+        raise HTTPException(status_code=413, detail="Image too large")
+    source.seek(0)
+    if sniff_image_type(source.read(16)) not in IMAGE_UPLOAD_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Uploaded file is not a supported image")
+    source.seek(0)
+    metrics.observe("uploads.bytes", size)
+
+
+def _open_path(source, chunk_size: int):
+    """A path the image workers can open for ``source``, and whether it is a copy to discard."""
+    try:
+        # Rolls an in-memory part over to Starlette's (unnamed) temp file, which the
+        # workers then open through /proc instead of a second copy on disk
+        path = f"/proc/{os.getpid()}/fd/{source.fileno()}"
+        if os.path.exists(path):
+            return path, False
+    except (AttributeError, OSError, ValueError):
+        pass
+    # No /proc (or no file descriptor): copy once
+    handle, path = tempfile.mkstemp(prefix="upload-", dir=UPLOAD_SPOOL_DIR)
+    try:
+        with os.fdopen(handle, "wb") as target:
+            source.seek(0)
+            shutil.copyfileobj(source, target, chunk_size)
+    except BaseException:
+        discard(path)
+        raise
+    return path, True
+
+
+def _prepare(source, max_bytes: int, chunk_size: int):
+    _check(source, max_bytes)
+    return _open_path(source, chunk_size)
+
+
+@asynccontextmanager
+async def upload_path(upload: UploadFile, max_bytes: int = IMAGE_MAX_BYTES, chunk_size: int = UPLOAD_CHUNK_BYTES):
+    """Validate an uploaded image and yield a path to it for the image pipeline (``None`` without one).
+
+    The format is sniffed from the first bytes and the size read from the
+    spooled part, so a rejected upload is never copied. The path stays valid
+    until the block exits.
+    """
+    if upload is None:
+        yield None
+        return
+    path, copied = await run_in_threadpool(_prepare, upload.file, max_bytes, chunk_size)
+    try:
+        yield path
+    finally:
+        if copied:
+            discard(path)
+
+
+def discard(path: str):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class UploadSizeLimit:
+    """ASGI middleware capping multipart request bodies before they are parsed.
+
+    Starlette's form parser spools every part, however large, before the
+    endpoint runs. Bodies announcing a larger ``Content-Length`` are refused
+    upfront, and chunked bodies fail with 413 once ``max_bytes`` have arrived.
+    """
+
+    def __init__(self, app, max_bytes: int = IMAGE_MAX_BYTES + UPLOAD_MAX_FORM_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        length = headers.get(b"content-length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            metrics.increment("uploads.rejected")
+            return await self._too_large(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    metrics.increment("uploads.rejected")
+                    # Raised inside the form parser; FastAPI passes HTTPException through as the response
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+    async def _too_large(self, scope, receive, send):
+        logger.warning(f"Refused {scope['method']} {scope['path']}: multipart body over {self.max_bytes} bytes")
+        response = JSONResponse({"detail": "Request body too large"}, status_code=413, headers={"Connection": "close"})
+        await response(scope, receive, send)
@@ -0,0 +1,101 @@
+from collections import Counter
+from sqlalchemy import bindparam, func
+from sqlalchemy.orm import Session
+from app.core.config import VIEW_BUFFER_SIZE, VIEW_FLUSH_BATCH_SIZE
+from app.core.metrics import metrics
+from app.core.trending import trending
+from app.db.dialect import dialect_insert
+from app.models.blog import Blog
+from app.models.feedback import View
+import logging, threading, time
+
+
+logger = logging.getLogger(__name__)
+
+
+class ViewBuffer:
+    """Write-behind queue for first-time blog views.
+
+    ``record`` only touches memory; ``flush`` (run by a periodic job and on
+    shutdown) inserts the queued views with ``ON CONFLICT DO NOTHING`` and adds
+    the number of rows actually inserted to each blog's ``read_count`` in one
+    UPDATE per blog, so a popular post takes one row lock per flush instead of
+    one per reader. When the buffer is full new views are dropped and counted
+    rather than blocking the request.
+    """
+
+    def __init__(self, max_size: int, batch_size: int):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = {}
+
+
+    def record(self, blog_id: int, user_id: int):
+        key = (blog_id, user_id)
+        with self._lock:
+            if key not in self._pending:
+                if len(self._pending) >= self.max_size:
+                    metrics.increment("views.dropped")
+                    return False
+                self._pending[key] = time.monotonic()
+            metrics.set_gauge("views.buffered", len(self._pending))
+        return True
+
+
+    def _requeue(self, batch: dict):
+        with self._lock:
+            for key, queued_at in batch.items():
+                if len(self._pending) >= self.max_size:
+                    metrics.increment("views.dropped")
+                    continue
+                self._pending.setdefault(key, queued_at)
+            metrics.set_gauge("views.buffered", len(self._pending))
+
+
+    def flush(self, db: Session):
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            metrics.set_gauge("views.buffered", 0)
+
+        started = time.monotonic()
+        views = Counter()
+        try:
+            keys = sorted(batch)
+            for offset in range(0, len(keys), self.batch_size):
+                chunk = keys[offset:offset + self.batch_size]
+                statement = (
+                    dialect_insert(db, View)
+                    .values([{"blog_id": blog_id, "user_id": user_id} for blog_id, user_id in chunk])
+                    .on_conflict_do_nothing(index_elements=["user_id", "blog_id"])
+                    .returning(View.blog_id)
+                )
+                views.update(db.execute(statement).scalars())
+            if views:
+                # Blogs are updated in id order so concurrent flushes from other workers cannot deadlock
+                blogs = Blog.__table__
+                db.execute(
+                    blogs.update()
+                    .where(blogs.c.id == bindparam("blog_id"))
+                    .values(read_count=func.coalesce(blogs.c.read_count, 0) + bindparam("views")),
+                    [{"blog_id": blog_id, "views": count} for blog_id, count in sorted(views.items())]
+                )
+            trending.mark(db, *views)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._requeue(batch)
+            raise
+
+        recorded = sum(views.values())
+        metrics.increment("views.flushed", recorded)
+        metrics.set_gauge("views.last_flush_size", len(batch))
+        metrics.observe("views.flush_lag", started - min(batch.values()))
+        metrics.observe("views.flush", time.monotonic() - started)
+        logger.debug(f"Flushed {len(batch)} queued views, {recorded} new across {len(views)} blogs")
+        return recorded
+
+
+view_buffer = ViewBuffer(VIEW_BUFFER_SIZE, VIEW_FLUSH_BATCH_SIZE)
@@ -1,11 +1,139 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from ..core.config import DATABASE_URL
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from ..core.config import (
+    DATABASE_URL, DB_ASYNC, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_POOL_WAIT_WARN_MS, DATABASE_REPLICA_URLS, READ_YOUR_WRITES_SECONDS
+)
+from ..core.metrics import metrics
+import itertools, logging, time
 
 
-engine = create_engine(DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+
+def instrumented_pool(pool_class, name: str):
+    class InstrumentedPool(pool_class):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                return super().connect()
+            except PoolTimeoutError:
+                metrics.increment(f"db.{name}.checkout_timeouts")
+                logger.warning(f"Connection pool {name} exhausted: {self.status()}")
+                raise
+            finally:
+                waited = time.perf_counter() - started
+                metrics.observe(f"db.{name}.checkout_wait", waited)
+                if waited * 1000 > DB_POOL_WAIT_WARN_MS:
+                    logger.warning(f"Waited {waited * 1000:.0f} ms for a connection from pool {name}: {self.status()}")
+
+    return InstrumentedPool
+
+
+def pool_options(url, pool_class, name: str):
+    # SQLite (local runs and tests) keeps SQLAlchemy's default pool
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": instrumented_pool(pool_class, name),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def track_pool(sync_engine, name: str):
+    def update(returning: int):
+        pool = sync_engine.pool
+        if isinstance(pool, QueuePool):
+            checked_out = pool.checkedout() - returning
+            metrics.set_gauge(f"db.{name}.checked_out", checked_out)
+            metrics.set_gauge(f"db.{name}.overflow", max(0, checked_out - pool.size()))
+
+    # "checkin" fires before the connection is back in the queue
+    event.listen(sync_engine, "checkout", lambda *args: update(0))
+    event.listen(sync_engine, "checkin", lambda *args: update(1))
+
+
+def async_database_url(url: str):
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg takes "ssl" rather than libpq's "sslmode"
+        if "sslmode" in url.query:
+            url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": url.query["sslmode"]})
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, QueuePool, "primary"))
+track_pool(engine, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL), **pool_options(DATABASE_URL, AsyncAdaptedQueuePool, "primary_async")
+    )
+    track_pool(async_engine.sync_engine, "primary_async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+replica_engines = []
+async_replica_engines = []
+ReplicaSessions = []
+AsyncReplicaSessions = []
+for index, replica_url in enumerate(DATABASE_REPLICA_URLS):
+    replica_engine = create_engine(replica_url, **pool_options(replica_url, QueuePool, f"replica{index}"))
+    track_pool(replica_engine, f"replica{index}")
+    replica_engines.append(replica_engine)
+    ReplicaSessions.append(sessionmaker(autocommit=False, autoflush=False, bind=replica_engine))
+    if DB_ASYNC:
+        async_replica_engine = create_async_engine(
+            async_database_url(replica_url), **pool_options(replica_url, AsyncAdaptedQueuePool, f"replica{index}_async")
+        )
+        track_pool(async_replica_engine.sync_engine, f"replica{index}_async")
+        async_replica_engines.append(async_replica_engine)
+        AsyncReplicaSessions.append(async_sessionmaker(async_replica_engine, autoflush=False))
+_replica_cycle = itertools.cycle(range(len(ReplicaSessions)))
+
+
+def _warm_up_sync(sync_engine, count: int):
+    connections = [sync_engine.connect() for _ in range(count)]
+    for connection in connections:
+        connection.close()
+
+
+async def _warm_up_async(async_engine, count: int):
+    connections = [await async_engine.connect() for _ in range(count)]
+    for connection in connections:
+        await connection.close()
+
+
+async def warm_up_pools():
+    """Open ``DB_POOL_SIZE`` connections per pooled engine before the worker starts taking traffic."""
+    started = time.perf_counter()
+    warmed = 0
+    # Decided per engine: only queue pools keep connections (not SQLite's pools, for instance)
+    for sync_engine in [engine, *replica_engines]:
+        if isinstance(sync_engine.pool, QueuePool):
+            await run_in_threadpool(_warm_up_sync, sync_engine, DB_POOL_SIZE)
+            warmed += 1
+    for pooled_async_engine in [async_engine, *async_replica_engines]:
+        if pooled_async_engine is not None and isinstance(pooled_async_engine.pool, QueuePool):
+            await _warm_up_async(pooled_async_engine, DB_POOL_SIZE)
+            warmed += 1
+    logger.info(f"Warmed up {warmed} database pools with {DB_POOL_SIZE} connections each in {(time.perf_counter() - started) * 1000:.0f} ms")
+
 
 def get_db():
     db = SessionLocal()
@@ -14,3 +142,60 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+PRIMARY_PIN_COOKIE = "db_primary_until"
+
+
+def pin_to_primary(response):
+    """Route this client's reads to the primary until replicas have caught up with its write."""
+    until = int(time.time()) + READ_YOUR_WRITES_SECONDS
+    response.set_cookie(key=PRIMARY_PIN_COOKIE, value=str(until), max_age=READ_YOUR_WRITES_SECONDS, httponly=True, samesite="lax")
+
+
+def is_pinned_to_primary(request: Request):
+    try:
+        return int(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request):
+    if not ReplicaSessions or is_pinned_to_primary(request):
+        yield from get_db()
+        return
+    db = ReplicaSessions[next(_replica_cycle)]()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    if not AsyncReplicaSessions or is_pinned_to_primary(request):
+        session_factory = AsyncSessionLocal
+    else:
+        session_factory = AsyncReplicaSessions[next(_replica_cycle)]
+    async with session_factory() as db:
+        yield db
+
+
+# Session dependencies for the service layer, selected by DB_ASYNC. Routes that
+# never write use get_read_session, which load-balances across replicas.
+get_session = get_async_db if DB_ASYNC else get_db
+get_read_session = get_async_read_db if DB_ASYNC else get_read_db
+
+
+async def run_with_session(db, func, *args, **kwargs):
+    """Call ``func(session, ...)`` without blocking the event loop.
+
+    With an AsyncSession the sync code runs through ``run_sync`` so its queries
+    are awaited on asyncpg; with a plain Session it runs in the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: func(session, *args, **kwargs))
+    return await run_in_threadpool(func, db, *args, **kwargs)
@@ -0,0 +1,16 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, table):
+    """``INSERT`` construct with ``ON CONFLICT`` support for the session's backend.
+
+    Production runs on PostgreSQL; SQLite is used for local runs. Both accept
+    ``on_conflict_do_nothing`` / ``on_conflict_do_update`` and ``RETURNING``.
+    """
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+    raise ValueError(f"Unsupported database dialect {name!r} for ON CONFLICT inserts; expected 'postgresql' or 'sqlite'")
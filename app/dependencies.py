@@ -1,30 +1,38 @@
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.core.config import SECRET_KEY
-from app.db.database import get_db
-from app.models.user import User
-from app.models.logout import Logout
+from app.db.database import get_session, get_read_session, run_with_session
+from app.services.async_service import AsyncBlogService, AsyncUserService, AsyncAdminService
+from app.core.principals import load_principal
+from app.core.security import decode_token
+from app.core.token_cache import revoked_tokens
+from app.core.storage import get_storage
 import jwt, logging
 
 
 logger = logging.getLogger(__name__)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-async def get_current_user(request: Request, db: Session = Depends(get_db)):
+def authenticate(token: str, db: Session):
+    payload = decode_token(token)
+    if revoked_tokens.is_revoked(db, payload["jti"], payload.get("exp")):
+        raise HTTPException(status_code=401, detail="Unauthorized!")
+
+    email = payload.get("sub")
+    if not email:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user = load_principal(db, email)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    if payload["ver"] != user.token_version:
+        raise HTTPException(status_code=401, detail="Unauthorized!")
+
+    return user
+
+
+async def get_current_user(request: Request, db: Session = Depends(get_session)):
     try:
-        token = request.cookies.get("access_token")
-        revoked_token = db.query(Logout).filter(Logout.token == token).first()
-        if revoked_token:
-            raise HTTPException(status_code=401, detail="Unauthorized!")
-
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
+        user = await run_with_session(db, lambda session: authenticate(request.cookies.get("access_token"), session))
         if user.is_blocked:
             raise HTTPException(status_code=403, detail="Account is blocked, please contact support!")
         
@@ -43,22 +51,9 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-async def get_current_admin(request: Request, db: Session = Depends(get_db)):
+async def get_current_admin(request: Request, db: Session = Depends(get_session)):
     try:
-        token = request.cookies.get("access_token")
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        email = payload.get("sub")
-        revoked_token = db.query(Logout).filter(Logout.token == token).first()
-        if revoked_token:
-            raise HTTPException(status_code=401, detail="Unauthorized!")
-
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
+        user = await run_with_session(db, lambda session: authenticate(request.cookies.get("access_token"), session))
         if not user.is_admin:
             raise HTTPException(status_code=403, detail="Admin access required")
         
@@ -76,3 +71,22 @@ async def get_current_admin(request: Request, db: Session = Depends(get_db)):
         logger.error(f"Internal server error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+
+async def get_blog_service(db: Session = Depends(get_session), storage = Depends(get_storage)):
+    return AsyncBlogService(db, storage)
+
+
+async def get_user_service(db: Session = Depends(get_session)):
+    return AsyncUserService(db)
+
+
+async def get_admin_service(db: Session = Depends(get_session)):
+    return AsyncAdminService(db)
+
+
+async def get_read_blog_service(db: Session = Depends(get_read_session), storage = Depends(get_storage)):
+    return AsyncBlogService(db, storage)
+
+
+async def get_read_admin_service(db: Session = Depends(get_read_session)):
+    return AsyncAdminService(db)
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index, JSON, DDL, event
 from app.db.base import Base
 
 
@@ -10,10 +10,73 @@ class Blog(Base):
     author_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String, nullable=False, unique=True)
     content = Column(Text, nullable=False)
+    # Derived from content on write for list views
+    excerpt = Column(String, nullable=True)
+    reading_time = Column(Integer, nullable=False, default=1, server_default="1")
     image_url = Column(String, nullable=True)
+    # {"thumb" | "card" | "full": {"url", "width", "height"}} WebP variants; see app/core/images.py
+    # NULL (not JSON null) while a direct upload waits for its variants
+    image_variants = Column(JSON(none_as_null=True), nullable=True)
+    # Lease and attempt count of the job deriving a pending upload's variants
+    image_claimed_until = Column(DateTime, nullable=True)
+    image_attempts = Column(Integer, nullable=False, default=0, server_default="0")
     read_count = Column(Integer, default=0)
+    # Maintained by the like/dislike toggles; see app/commands/repair_counters.py
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    dislike_count = Column(Integer, nullable=False, default=0, server_default="0")
     is_blocked = Column(Boolean, default=False)
     is_deleted = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
+    # Partial indexes matching the feed queries; check with app/commands/check_query_plans.py
+    __table_args__ = (
+        Index(
+            "ix_blogs_visible_created_at", created_at, id,
+            postgresql_where=(is_deleted == False) & (is_blocked == False),
+            sqlite_where=(is_deleted == False) & (is_blocked == False),
+        ),
+        Index(
+            "ix_blogs_author_created_at", author_id, created_at, id,
+            postgresql_where=is_deleted == False,
+            sqlite_where=is_deleted == False,
+        ),
+        # Images still waiting for variants, polled by the direct upload job
+        Index(
+            "ix_blogs_pending_image", id,
+            postgresql_where=(image_url != None) & (image_variants == None) & (is_deleted == False),
+            sqlite_where=(image_url != None) & (image_variants == None) & (is_deleted == False),
+        ),
+    )
+
+
+# Full-text search lives outside the mapped columns, maintained by the database on
+# every write: a generated, GIN-indexed tsvector on PostgreSQL and an FTS5 table
+# kept in sync by triggers on SQLite (local runs). The migration creates them on
+# existing databases; these hooks cover create_all. See app/core/search.py.
+SEARCH_DDL = {
+    "postgresql": [
+        """ALTER TABLE blogs ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'B')
+        ) STORED""",
+        "CREATE INDEX ix_blogs_search_vector ON blogs USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE blogs_fts USING fts5(title, content, content='blogs', content_rowid='id')",
+        """CREATE TRIGGER blogs_fts_insert AFTER INSERT ON blogs BEGIN
+            INSERT INTO blogs_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+        """CREATE TRIGGER blogs_fts_delete AFTER DELETE ON blogs BEGIN
+            INSERT INTO blogs_fts (blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END""",
+        """CREATE TRIGGER blogs_fts_update AFTER UPDATE OF title, content ON blogs BEGIN
+            INSERT INTO blogs_fts (blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO blogs_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+    ],
+}
+
+for dialect, statements in SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Blog.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Boolean
 from datetime import datetime, timezone
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, Index
 from app.db.base import Base
 
 
@@ -13,8 +13,21 @@ class Feedback(Base):
     comment = Column(Text, nullable=False)
     is_listed = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # Public feedback pages and the detail page's feedback_count
+        Index(
+            "ix_feedbacks_listed_blog_created_at", blog_id, created_at, id,
+            postgresql_where=(is_deleted == False) & (is_listed == True),
+            sqlite_where=(is_deleted == False) & (is_listed == True),
+        ),
+        # Admin listing (every listed state, ordered by id) and bulk moderation by blog
+        Index("ix_feedbacks_blog_id_id", blog_id, id),
+        # One-feedback-per-user check and bulk moderation by user
+        Index("ix_feedbacks_user_id_blog_id", user_id, blog_id),
+    )
 
 
 class View(Base):
@@ -23,9 +36,12 @@ class View(Base):
     id = Column(Integer, primary_key=True)
     blog_id = Column(Integer, ForeignKey("blogs.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
-    __table_args__ = (UniqueConstraint('user_id', 'blog_id', name='uq_views_user_blog'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'blog_id', name='uq_views_user_blog'),
+        Index("ix_views_blog_id", blog_id),
+    )
 
 
 class Like(Base):
@@ -35,8 +51,12 @@ class Like(Base):
     blog_id = Column(Integer, ForeignKey("blogs.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
     is_like = Column(Boolean, nullable=False)  # True = like, False = dislike
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
-
-    __table_args__ = (UniqueConstraint('user_id', 'blog_id', name='uq_likes_user_blog'),)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'blog_id', name='uq_likes_user_blog'),
+        # Covers per-blog like/dislike counts (repair_counters)
+        Index("ix_likes_blog_id_is_like", blog_id, is_like),
+    )
 
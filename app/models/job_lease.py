@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from app.db.base import Base
+
+
+class JobLease(Base):
+    """Which periodic job run currently holds its slot; see ``claim_lease`` in app/core/jobs.py."""
+
+    __tablename__ = "job_leases"
+
+    name = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False)
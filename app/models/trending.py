@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from app.db.base import Base
+
+
+class TrendingScore(Base):
+    """Precomputed trending rank per visible blog; written only by app/core/trending.py."""
+
+    __tablename__ = "blog_trending_scores"
+
+    blog_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_blog_trending_scores_score_blog_id", score.desc(), blog_id.desc()),)
+
+
+class TrendingDirty(Base):
+    """Blogs whose trending score is stale, queued in the same transaction as the change."""
+
+    __tablename__ = "trending_dirty"
+
+    blog_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True)
+    marked_at = Column(DateTime, nullable=False)
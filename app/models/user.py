@@ -12,4 +12,5 @@ class User(Base):
     is_blocked = Column(Boolean, default=False)
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
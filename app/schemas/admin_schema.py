@@ -0,0 +1,29 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+
+
+MAX_BULK_IDS = 1000
+
+
+class BulkBlockUsers(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    blocked: bool = True
+
+
+class BulkBlockBlogs(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    blocked: bool = True
+
+
+class BulkFeedbackListed(BaseModel):
+    # Either explicit ids or a filter such as all feedback by one user
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=MAX_BULK_IDS)
+    user_id: Optional[int] = None
+    blog_id: Optional[int] = None
+    is_listed: bool = False
+
+    @model_validator(mode="after")
+    def require_ids_or_filter(self):
+        if self.ids is None and self.user_id is None and self.blog_id is None:
+            raise ValueError("Provide ids or a user_id / blog_id filter")
+        return self
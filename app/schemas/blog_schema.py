@@ -4,3 +4,11 @@ from pydantic import BaseModel
 class FeedbackCreate(BaseModel):
     comment: str
 
+
+
+class ImageUploadCreate(BaseModel):
+    content_type: str
+
+
+class ImageUploadAttach(BaseModel):
+    key: str
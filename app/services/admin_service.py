@@ -1,45 +1,55 @@
-from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
-import jwt, logging
+import logging
+from datetime import datetime, timezone
 from fastapi.responses import JSONResponse
 from app.models.user import User
 from app.models.blog import Blog
 from app.models.feedback import Feedback
-from app.core.config import SECRET_KEY
-from passlib.context import CryptContext
+from app.core.security import access_token_expires, refresh_token_expires, issue_tokens
+from app.core.principals import invalidate_principal
+from app.core.feed_cache import feed_cache
+from app.core.fields import select_fields, query_columns
+from app.core.loaders import UserNameLoader
+from app.core.counts import counts
+from app.core.trending import trending
+from app.core.passwords import password_hasher
+from sqlalchemy import update, func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 
 logger = logging.getLogger(__name__)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-access_token_expires = timedelta(minutes=15)
-refresh_token_expires = timedelta(days=30)
+
+ADMIN_BLOG_FIELDS = {
+    "id": Blog.id,
+    "title": Blog.title,
+    "excerpt": Blog.excerpt,
+    "content": Blog.content,
+    "reading_time": Blog.reading_time,
+    "image_url": Blog.image_url,
+    "image_variants": Blog.image_variants,
+    "is_blocked": Blog.is_blocked,
+    "created_at": Blog.created_at,
+    "updated_at": Blog.updated_at,
+}
+ADMIN_BLOG_DEFAULT_FIELDS = tuple(name for name in ADMIN_BLOG_FIELDS if name != "content")
 
 class AdminService:
     def __init__(self, db: Session):
         self.db = db
+        self.user_names = UserNameLoader(db)
 
 
     def admin_login_user(self, email: str, password: str):
         try:
             db_user = self.db.query(User).filter(User.email == email).first()
-            if not db_user or not pwd_context.verify(password, db_user.password):
+            if not db_user or not password_hasher.verify(password, db_user.password):
                 raise HTTPException(status_code=401, detail="Invalid credentials")
             if not db_user.is_admin:
                 raise HTTPException(status_code=403, detail="Admin access required")
 
             # Generate token
-            access_token = jwt.encode(
-                {"sub": db_user.email, "id": db_user.id, "exp": datetime.now(timezone.utc) + access_token_expires},
-                SECRET_KEY,
-                algorithm="HS256"
-            )
-            refresh_token = jwt.encode(
-                {"sub": db_user.email, "id": db_user.id, "type": "refresh", "exp": datetime.now(timezone.utc) + refresh_token_expires},
-                SECRET_KEY,
-                algorithm="HS256"
-            )
+            access_token, refresh_token = issue_tokens(db_user)
 
             response = JSONResponse(content={"message": "Login successful"})
             response.set_cookie(key="access_token", value=access_token, httponly=True, max_age=access_token_expires, secure=False, samesite="lax")
@@ -57,28 +67,24 @@ class AdminService:
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def admin_get_all_blogs(self, page: int = 1, page_size: int = 10):
+    def admin_get_all_blogs(self, page: int = 1, page_size: int = 10, fields: str = None, exact: bool = False):
         try:
+            names = select_fields(fields, ADMIN_BLOG_FIELDS, ADMIN_BLOG_DEFAULT_FIELDS)
             offset = (page - 1) * page_size
-            blogs = self.db.query(Blog).filter(Blog.is_deleted == False).offset(offset).limit(page_size).all()
-            total_blogs = self.db.query(Blog).filter(Blog.is_deleted == False).count()
+            query = (
+                self.db.query(*query_columns(names, ADMIN_BLOG_FIELDS))
+                .filter(Blog.is_deleted == False)
+                .order_by(Blog.id)
+            )
+            blogs, total_blogs, total_is_exact = counts.fetch_page(self.db, "admin.blogs", query, offset, page_size, exact)
 
             if not blogs:
                 raise HTTPException(status_code=404, detail="No blogs found")
             
             return {
-                "blogs": [
-                    {
-                        "id": blog.id,
-                        "title": blog.title,
-                        "content": blog.content,
-                        "image_url": blog.image_url,
-                        "is_blocked": blog.is_blocked,
-                        "created_at": blog.created_at,
-                        "updated_at": blog.updated_at
-                    } for blog in blogs
-                ],
+                "blogs": [{name: getattr(blog, name) for name in names} for blog in blogs],
                 "total_blogs": total_blogs,
+                "total_is_exact": total_is_exact,
                 "page": page,
                 "page_size": page_size,
                 "total_pages": (total_blogs + page_size - 1) // page_size
@@ -94,11 +100,15 @@ class AdminService:
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def list_all_users(self, page: int = 1, page_size: int = 10):
+    def list_all_users(self, page: int = 1, page_size: int = 10, exact: bool = False):
         try:
             offset = (page - 1) * page_size
-            users = self.db.query(User).filter(User.is_admin == False).offset(offset).limit(page_size).all()
-            total_users = self.db.query(User).filter(User.is_admin == False).count()
+            query = (
+                self.db.query(User.id, User.full_name, User.email, User.is_blocked, User.created_at)
+                .filter(User.is_admin == False)
+                .order_by(User.id)
+            )
+            users, total_users, total_is_exact = counts.fetch_page(self.db, "admin.users", query, offset, page_size, exact)
 
             if not users:
                 raise HTTPException(status_code=404, detail="No users found")
@@ -114,6 +124,7 @@ class AdminService:
                     } for user in users
                 ],
                 "total_users": total_users,
+                "total_is_exact": total_is_exact,
                 "page": page,
                 "page_size": page_size,
                 "total_pages": (total_users + page_size - 1) // page_size
@@ -136,6 +147,10 @@ class AdminService:
                 raise HTTPException(status_code=404, detail="User not found")
 
             user.is_blocked = not user.is_blocked
+            if user.is_blocked:
+                # Invalidates every token issued so far, including refresh tokens
+                user.token_version = (user.token_version or 0) + 1
+            invalidate_principal(self.db, user.email)
             self.db.commit()
             self.db.refresh(user)
             
@@ -162,8 +177,10 @@ class AdminService:
                 raise HTTPException(status_code=400, detail="Blog is deleted and cannot be blocked")
 
             blog.is_blocked = not blog.is_blocked
+            trending.mark(self.db, blog.id)
             self.db.commit()
             self.db.refresh(blog)
+            feed_cache.invalidate()
 
             return {"message": f"Blog is_blocked toggled to {blog.is_blocked}", "blog_id": blog.id}
         except HTTPException as e:
@@ -179,30 +196,148 @@ class AdminService:
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def get_feedbacks(self, blog_id: int, page: int = 1, page_size: int = 10):
+    def _bulk_results(self, ids, updated: set, outcomes: dict):
+        # outcomes holds the reason for every id that exists but was not updated
+        results = []
+        for item_id in dict.fromkeys(ids):
+            if item_id in updated:
+                status = "updated"
+            else:
+                status = outcomes.get(item_id, "not_found")
+            results.append({"id": item_id, "status": status})
+        return {"updated": len(updated), "results": results}
+
+
+    def bulk_block_users(self, user_ids: list, blocked: bool):
+        try:
+            values = {"is_blocked": blocked}
+            if blocked:
+                # Invalidates every token issued so far, as for a single block
+                values["token_version"] = User.token_version + 1
+            changed = self.db.execute(
+                update(User)
+                .where(User.id.in_(user_ids), User.is_admin == False, func.coalesce(User.is_blocked, False) != blocked)
+                .values(**values)
+                .returning(User.id, User.email)
+                .execution_options(synchronize_session=False)
+            ).all()
+            updated = {row.id for row in changed}
+            outcomes = {
+                row.id: "skipped_admin" if row.is_admin else "unchanged"
+                for row in self.db.query(User.id, User.is_admin).filter(User.id.in_(user_ids))
+            }
+            for row in changed:
+                invalidate_principal(self.db, row.email)
+            self.db.commit()
+
+            return self._bulk_results(user_ids, updated, outcomes)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error while bulk updating block status for users: {e}")
+            raise HTTPException(status_code=500, detail="Database error occurred")
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"Unexpected error while bulk updating block status for users: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+
+    def bulk_block_blogs(self, blog_ids: list, blocked: bool):
+        try:
+            updated = set(self.db.execute(
+                update(Blog)
+                .where(Blog.id.in_(blog_ids), func.coalesce(Blog.is_deleted, False) == False, func.coalesce(Blog.is_blocked, False) != blocked)
+                .values(is_blocked=blocked)
+                .returning(Blog.id)
+                .execution_options(synchronize_session=False)
+            ).scalars())
+            outcomes = {
+                row.id: "skipped_deleted" if row.is_deleted else "unchanged"
+                for row in self.db.query(Blog.id, Blog.is_deleted).filter(Blog.id.in_(blog_ids))
+            }
+            trending.mark(self.db, *updated)
+            self.db.commit()
+            if updated:
+                feed_cache.invalidate()
+
+            return self._bulk_results(blog_ids, updated, outcomes)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error while bulk updating block status for blogs: {e}")
+            raise HTTPException(status_code=500, detail="Database error occurred")
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"Unexpected error while bulk updating block status for blogs: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+
+    def bulk_set_feedback_listed(self, is_listed: bool, feedback_ids: list = None, user_id: int = None, blog_id: int = None):
+        try:
+            conditions = []
+            if feedback_ids is not None:
+                conditions.append(Feedback.id.in_(feedback_ids))
+            if user_id is not None:
+                conditions.append(Feedback.user_id == user_id)
+            if blog_id is not None:
+                conditions.append(Feedback.blog_id == blog_id)
+
+            changed = self.db.execute(
+                update(Feedback)
+                .where(*conditions, func.coalesce(Feedback.is_deleted, False) == False, func.coalesce(Feedback.is_listed, True) != is_listed)
+                .values(is_listed=is_listed, updated_at=datetime.now(timezone.utc))
+                .returning(Feedback.id, Feedback.blog_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            updated = {row.id for row in changed}
+            matched = self.db.query(Feedback.id, Feedback.is_deleted).filter(*conditions).order_by(Feedback.id).all()
+            outcomes = {row.id: "skipped_deleted" if row.is_deleted else "unchanged" for row in matched}
+            trending.mark(self.db, *{row.blog_id for row in changed})
+            self.db.commit()
+
+            ids = feedback_ids if feedback_ids is not None else [row.id for row in matched]
+            return self._bulk_results(ids, updated, outcomes)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error while bulk updating feedback listed status: {e}")
+            raise HTTPException(status_code=500, detail="Database error occurred")
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"Unexpected error while bulk updating feedback listed status: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+
+    def get_feedbacks(self, blog_id: int, page: int = 1, page_size: int = 10, exact: bool = False):
         try:
             blog = self.db.query(Blog).filter(Blog.id == blog_id).first()
             if not blog:
                 raise HTTPException(status_code=404, detail="Blog not found")
 
             offset = (page - 1) * page_size
-            feedbacks = self.db.query(Feedback).filter(Feedback.blog_id == blog_id, Feedback.is_deleted == False).offset(offset).limit(page_size).all()
-            total_feedbacks = self.db.query(Feedback).filter(Feedback.blog_id == blog_id, Feedback.is_deleted == False).count()
+            query = (
+                self.db.query(Feedback.id, Feedback.user_id, Feedback.comment, Feedback.is_listed, Feedback.created_at)
+                .filter(Feedback.blog_id == blog_id, Feedback.is_deleted == False)
+                .order_by(Feedback.id)
+            )
+            feedbacks, total_feedbacks, total_is_exact = counts.fetch_page(
+                self.db, ("admin.feedbacks", blog_id), query, offset, page_size, exact
+            )
 
             if not feedbacks:
                 raise HTTPException(status_code=404, detail="No feedbacks found for this blog")
+            usernames = self.user_names.load_many([feedback.user_id for feedback in feedbacks])
 
             return {
                 "feedbacks": [
                     {
                         "id": feedback.id,
                         "user_id": feedback.user_id,
+                        "username": usernames[feedback.user_id],
                         "content": feedback.comment,
                         "is_listed": feedback.is_listed,
                         "created_at": feedback.created_at
                     } for feedback in feedbacks
                 ],
                 "total_feedbacks": total_feedbacks,
+                "total_is_exact": total_is_exact,
                 "page": page,
                 "page_size": page_size,
                 "total_pages": (total_feedbacks + page_size - 1) // page_size
@@ -227,6 +362,7 @@ class AdminService:
                 raise HTTPException(status_code=400, detail="Feedback is deleted and cannot be toggled")
 
             feedback.is_listed = not feedback.is_listed
+            trending.mark(self.db, feedback.blog_id)
             self.db.commit()
             self.db.refresh(feedback)
 
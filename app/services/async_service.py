@@ -0,0 +1,157 @@
+from app.db.database import run_with_session
+from app.models.user import User
+from app.services.blog_service import BlogService
+from app.services.user_service import UserService
+from app.services.admin_service import AdminService
+
+
+class AsyncService:
+    """Awaitable variant of a sync service.
+
+    Each method runs the sync implementation through ``run_with_session``, so
+    the same business logic serves both the sync and the asyncpg engine.
+    Extra constructor arguments (e.g. injected clients) are passed on to
+    ``service_class``.
+    """
+
+    service_class = None
+
+    def __init__(self, db, *args):
+        self.db = db
+        self.args = args
+
+
+    async def _run(self, method, *args):
+        return await run_with_session(self.db, lambda session: method(self.service_class(session, *self.args), *args))
+
+
+class AsyncBlogService(AsyncService):
+    service_class = BlogService
+
+
+    async def get_all_blogs(self, page: int = 1, page_size: int = 10, cursor: str = None, fields: str = None, sort: str = "latest"):
+        return await self._run(BlogService.get_all_blogs, page, page_size, cursor, fields, sort)
+
+
+    async def search_blogs(self, q: str, page_size: int = 10, cursor: str = None):
+        return await self._run(BlogService.search_blogs, q, page_size, cursor)
+
+
+    async def view_blog_detail(self, blog_id: int, current_user_id: int):
+        return await self._run(BlogService.view_blog_detail, blog_id, current_user_id)
+
+
+    async def create_blog(self, author_id: int, title: str, content: str, image_path: str = None):
+        return await self._run(BlogService.create_blog, author_id, title, content, image_path)
+
+
+    async def get_user_blogs(self, author_id: int, page: int = 1, page_size: int = 10, cursor: str = None, fields: str = None):
+        return await self._run(BlogService.get_user_blogs, author_id, page, page_size, cursor, fields)
+
+
+    async def edit_blog(self, blog_id: int, author_id: int, title: str = None, content: str = None, image_path: str = None):
+        return await self._run(BlogService.edit_blog, blog_id, author_id, title, content, image_path)
+
+
+    async def delete_blog(self, blog_id: int, author_id: int):
+        return await self._run(BlogService.delete_blog, blog_id, author_id)
+
+
+    async def create_image_upload(self, author_id: int, content_type: str):
+        return await self._run(BlogService.create_image_upload, author_id, content_type)
+
+
+    async def attach_uploaded_image(self, blog_id: int, author_id: int, key: str):
+        return await self._run(BlogService.attach_uploaded_image, blog_id, author_id, key)
+
+
+    async def like_or_unlike_blog(self, blog_id: int, user_id: int):
+        return await self._run(BlogService.like_or_unlike_blog, blog_id, user_id)
+
+
+    async def dislike_or_undislike_blog(self, blog_id: int, user_id: int):
+        return await self._run(BlogService.dislike_or_undislike_blog, blog_id, user_id)
+
+
+    async def get_feedbacks(self, blog_id: int, current_user: User, page: int = 1, page_size: int = 10, cursor: str = None):
+        return await self._run(BlogService.get_feedbacks, blog_id, current_user, page, page_size, cursor)
+
+
+    async def create_feedback(self, blog_id: int, user_id: int, comment: str):
+        return await self._run(BlogService.create_feedback, blog_id, user_id, comment)
+
+
+    async def edit_feedback(self, feedback_id: int, user_id: int, comment: str):
+        return await self._run(BlogService.edit_feedback, feedback_id, user_id, comment)
+
+
+    async def delete_feedback(self, feedback_id: int, user_id: int):
+        return await self._run(BlogService.delete_feedback, feedback_id, user_id)
+
+
+class AsyncUserService(AsyncService):
+    service_class = UserService
+
+
+    async def register_user(self, user_data: dict):
+        return await self._run(UserService.register_user, user_data)
+
+
+    async def login_user(self, email: str, password: str):
+        return await self._run(UserService.login_user, email, password)
+
+
+    async def logout_user(self, access_token: str, refresh_token: str, user_id: int):
+        return await self._run(UserService.logout_user, access_token, refresh_token, user_id)
+
+
+    async def logout_all_sessions(self, user_id: int):
+        return await self._run(UserService.logout_all_sessions, user_id)
+
+
+    async def refresh_token(self, token_str: str):
+        return await self._run(UserService.refresh_token, token_str)
+
+
+class AsyncAdminService(AsyncService):
+    service_class = AdminService
+
+
+    async def admin_login_user(self, email: str, password: str):
+        return await self._run(AdminService.admin_login_user, email, password)
+
+
+    async def admin_get_all_blogs(self, page: int = 1, page_size: int = 10, fields: str = None, exact: bool = False):
+        return await self._run(AdminService.admin_get_all_blogs, page, page_size, fields, exact)
+
+
+    async def list_all_users(self, page: int = 1, page_size: int = 10, exact: bool = False):
+        return await self._run(AdminService.list_all_users, page, page_size, exact)
+
+
+    async def block_unblock_user(self, user_id: int):
+        return await self._run(AdminService.block_unblock_user, user_id)
+
+
+    async def block_unblock_blog(self, blog_id: int):
+        return await self._run(AdminService.block_unblock_blog, blog_id)
+
+
+    async def bulk_block_users(self, user_ids: list, blocked: bool):
+        return await self._run(AdminService.bulk_block_users, user_ids, blocked)
+
+
+    async def bulk_block_blogs(self, blog_ids: list, blocked: bool):
+        return await self._run(AdminService.bulk_block_blogs, blog_ids, blocked)
+
+
+    async def bulk_set_feedback_listed(self, is_listed: bool, feedback_ids: list = None, user_id: int = None, blog_id: int = None):
+        return await self._run(AdminService.bulk_set_feedback_listed, is_listed, feedback_ids, user_id, blog_id)
+
+
+    async def get_feedbacks(self, blog_id: int, page: int = 1, page_size: int = 10, exact: bool = False):
+        return await self._run(AdminService.get_feedbacks, blog_id, page, page_size, exact)
+
+
+    async def toggle_feedback_listed(self, feedback_id: int):
+        return await self._run(AdminService.toggle_feedback_listed, feedback_id)
@@ -1,112 +1,234 @@
 from sqlalchemy.orm import Session
-import boto3, logging, io, re
-from datetime import datetime, timezone
+import logging, math, re, uuid
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
-from sqlalchemy import func, case
-from sqlalchemy.exc import SQLAlchemyError
-from PIL import Image, UnidentifiedImageError
+from sqlalchemy import select, update, delete, exists, func, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.models.user import User
 from app.models.blog import Blog
 from app.models.feedback import Like, Feedback, View
-from app.core.config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION, AWS_BUCKET_NAME
+from app.models.trending import TrendingScore
+from app.core.pagination import paginate, next_cursor, paginate_by_score, next_score_cursor
+from app.core.feed_cache import feed_cache
+from app.core.fields import select_fields, query_columns
+from app.core.view_buffer import view_buffer
+from app.core.counts import counts
+from app.core.search import search_blogs, render_snippet
+from app.core.storage import storage as default_storage
+from app.core.images import image_pipeline
+from app.core.concurrency import run_blocking
+from app.core.config import (
+    IMAGE_MAX_BYTES, IMAGE_UPLOAD_CONTENT_TYPES, IMAGE_UPLOAD_EXPIRES_SECONDS,
+    IMAGE_UPLOAD_DERIVE_MAX_ATTEMPTS, IMAGE_UPLOAD_DERIVE_LEASE_SECONDS
+)
+from app.core.trending import trending
+from app.db.dialect import dialect_insert
+from collections import namedtuple
 
 
 logger = logging.getLogger(__name__)
 
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+# Direct uploads land under uploads/{author_id}/ until the variant job replaces them
+UPLOAD_PREFIX = "uploads"
+
+
+def make_excerpt(content: str, length: int = EXCERPT_LENGTH):
+    text = " ".join(content.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "…"
+
+
+def estimate_reading_time(content: str):
+    return max(1, math.ceil(len(content.split()) / WORDS_PER_MINUTE))
+
+
+FEED_FIELDS = {
+    "id": Blog.id,
+    "title": Blog.title,
+    "excerpt": Blog.excerpt,
+    "content": Blog.content,
+    "reading_time": Blog.reading_time,
+    "image_url": Blog.image_url,
+    "image_variants": Blog.image_variants,
+    "read_count": Blog.read_count,
+    "like_count": Blog.like_count,
+    "dislike_count": Blog.dislike_count,
+    "created_at": Blog.created_at,
+}
+FEED_DEFAULT_FIELDS = tuple(name for name in FEED_FIELDS if name != "content")
+FEED_SORTS = ("latest", "trending")
+
+USER_BLOG_FIELDS = {**FEED_FIELDS, "updated_at": Blog.updated_at}
+USER_BLOG_DEFAULT_FIELDS = ("id", "title", "excerpt", "reading_time", "image_url", "image_variants", "read_count", "created_at", "updated_at")
+
+DETAIL_FEEDBACK_PAGE_SIZE = 10
+
+ReactionChange = namedtuple("ReactionChange", ["like_count", "dislike_count", "removed", "inserted", "flipped"])
+
+# Applies a like/dislike toggle and the matching counter update in one statement.
+# Clicking the current reaction deletes it; otherwise the upsert inserts a new row
+# or flips the existing one, and xmax = 0 tells the two apart. No row is written
+# twice, so two concurrent clicks serialize on the row lock instead of failing on
+# uq_likes_user_blog. No row is returned when the blog does not exist.
+TOGGLE_REACTION_SQL = text("""
+    WITH removed AS (
+        DELETE FROM likes
+        WHERE blog_id = :blog_id AND user_id = :user_id AND is_like = CAST(:is_like AS boolean)
+        RETURNING id
+    ),
+    upserted AS (
+        INSERT INTO likes (blog_id, user_id, is_like, created_at, updated_at)
+        SELECT :blog_id, :user_id, CAST(:is_like AS boolean), timezone('utc', now()), timezone('utc', now())
+        WHERE NOT EXISTS (SELECT 1 FROM removed) AND EXISTS (SELECT 1 FROM blogs WHERE id = :blog_id)
+        ON CONFLICT (user_id, blog_id) DO UPDATE
+            SET is_like = EXCLUDED.is_like, updated_at = EXCLUDED.updated_at
+            WHERE likes.is_like <> EXCLUDED.is_like
+        RETURNING (xmax = 0) AS inserted
+    ),
+    changes AS (
+        SELECT
+            (SELECT count(*) FROM removed) AS removed,
+            (SELECT count(*) FROM upserted WHERE inserted) AS inserted,
+            (SELECT count(*) FROM upserted WHERE NOT inserted) AS flipped
+    )
+    UPDATE blogs SET
+        like_count = like_count + CASE WHEN CAST(:is_like AS boolean)
+            THEN changes.inserted + changes.flipped - changes.removed ELSE -changes.flipped END,
+        dislike_count = dislike_count + CASE WHEN CAST(:is_like AS boolean)
+            THEN -changes.flipped ELSE changes.inserted + changes.flipped - changes.removed END
+    FROM changes
+    WHERE blogs.id = :blog_id
+    RETURNING blogs.like_count, blogs.dislike_count, changes.removed > 0 AS removed,
+        changes.inserted > 0 AS inserted, changes.flipped > 0 AS flipped
+""")
+
+
 class BlogService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, storage=None):
         self.db = db
-        self.s3 = boto3.client(
-            's3',
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION
-        )
+        self.storage = storage or default_storage
 
 
-    def get_all_blogs(self, page: int = 1, page_size: int = 10):
+    def get_all_blogs(self, page: int = 1, page_size: int = 10, cursor: str = None, fields: str = None, sort: str = "latest"):
         try:
-            offset = (page - 1) * page_size
-            blogs_with_counts = (
-                self.db.query(
-                    Blog.id,
-                    Blog.title,
-                    Blog.content,
-                    Blog.image_url,
-                    Blog.read_count,
-                    Blog.created_at,
-                    func.sum(case((Like.is_like == True, 1), else_=0)).label("like_count"),
-                    func.sum(case((Like.is_like == False, 1), else_=0)).label("dislike_count")
-                )
-                .outerjoin(Like, Blog.id == Like.blog_id)
+            if sort not in FEED_SORTS:
+                raise HTTPException(status_code=400, detail=f"Unknown sort: {sort}. Allowed: {', '.join(FEED_SORTS)}")
+            names = select_fields(fields, FEED_FIELDS, FEED_DEFAULT_FIELDS)
+            query = (
+                self.db.query(*query_columns(names, FEED_FIELDS, required=("id", "created_at")))
                 .filter(Blog.is_deleted == False, Blog.is_blocked == False)
-                .group_by(Blog.id)
-                .order_by(Blog.created_at.desc())
-                .offset(offset)
-                .limit(page_size)
-                .all()
             )
+            if sort == "trending":
+                # Walks ix_blog_trending_scores_score_blog_id; scores are precomputed by app/core/trending.py
+                query = query.add_columns(TrendingScore.score.label("score")).join(TrendingScore, TrendingScore.blog_id == Blog.id)
+                blogs = paginate_by_score(query, TrendingScore.score, TrendingScore.blog_id, page, page_size, cursor)
+                cursor_for_next_page = next_score_cursor(blogs, page_size)
+            else:
+                blogs = paginate(query, Blog.created_at, Blog.id, page, page_size, cursor)
+                cursor_for_next_page = next_cursor(blogs, page_size)
 
             return {
                 "page": page,
                 "page_size": page_size,
+                "sort": sort,
+                "next_cursor": cursor_for_next_page,
+                "blogs": [{name: getattr(blog, name) for name in names} for blog in blogs]
+            }
+        except HTTPException as e:
+            raise e
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error while fetching blogs: {e}")
+            raise HTTPException(status_code=500, detail="Database error occurred")
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"Unexpected error while fetching blogs: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+    
+
+    def search_blogs(self, q: str, page_size: int = 10, cursor: str = None):
+        try:
+            if not q or not q.strip():
+                raise HTTPException(status_code=400, detail="Search query must not be empty")
+            results, cursor_for_next_page = search_blogs(self.db, q.strip(), page_size, cursor)
+
+            return {
+                "query": q,
+                "page_size": page_size,
+                "next_cursor": cursor_for_next_page,
                 "blogs": [
                     {
-                        "id": blog.id,
-                        "title": blog.title,
-                        "content": blog.content,
-                        "image_url": blog.image_url,
-                        "read_count": blog.read_count,
-                        "like_count": blog.like_count or 0,
-                        "dislike_count": blog.dislike_count or 0,
-                        "created_at": blog.created_at,
+                        "id": result.id,
+                        "title": result.title,
+                        "excerpt": result.excerpt,
+                        "snippet": render_snippet(result.snippet),
+                        "score": result.score,
+                        "reading_time": result.reading_time,
+                        "image_url": result.image_url,
+                        "image_variants": result.image_variants,
+                        "read_count": result.read_count,
+                        "like_count": result.like_count,
+                        "dislike_count": result.dislike_count,
+                        "created_at": result.created_at
                     }
-                    for blog in blogs_with_counts
+                    for result in results
                 ]
             }
+        except HTTPException as e:
+            raise e
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"Database error while fetching blogs: {e}")
+            logger.error(f"Database error while searching blogs: {e}")
             raise HTTPException(status_code=500, detail="Database error occurred")
         except Exception as e:
             self.db.rollback()
-            logger.exception(f"Unexpected error while fetching blogs: {e}")
+            logger.exception(f"Unexpected error while searching blogs: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
-    
+
 
     def view_blog_detail(self, blog_id: int, current_user_id: int):
         try:
+            # Every aggregate is an independent scalar subquery on an indexed key, so
+            # the cost no longer grows with feedbacks x likes as a joined GROUP BY did
+            my_reaction = (
+                select(Like.is_like).where(Like.blog_id == Blog.id, Like.user_id == current_user_id).scalar_subquery()
+            )
+            feedback_count = (
+                select(func.count(Feedback.id))
+                .where(Feedback.blog_id == Blog.id, Feedback.is_deleted == False, Feedback.is_listed == True)
+                .scalar_subquery()
+            )
+            viewed = exists().where(View.blog_id == Blog.id, View.user_id == current_user_id)
             result = (
-                self.db.query(
-                    Blog,
-                    func.count(case((Like.is_like == True, Like.id), else_=0)).label("like_count"),
-                    func.count(case((Like.is_like == False, Like.id), else_=0)).label("dislike_count"),
-                )
-                .outerjoin(Feedback, Blog.id == Feedback.blog_id)
-                .outerjoin(Like, Blog.id == Like.blog_id)
+                self.db.query(Blog, my_reaction.label("my_reaction"), feedback_count.label("feedback_count"), viewed.label("viewed"))
                 .filter(Blog.id == blog_id, Blog.is_deleted == False, Blog.is_blocked == False)
-                .group_by(Blog.id)
                 .first()
             )
             if not result:
                 raise HTTPException(status_code=404, detail="Blog not found")
-            blog = result[0]
+            blog = result.Blog
 
-            existing_view = self.db.query(View).filter(View.blog_id == blog_id, View.user_id == current_user_id).first()
-            if not existing_view:
-                new_view = View(blog_id=blog_id, user_id=current_user_id)
-                self.db.add(new_view)
-                blog.read_count += 1
-                self.db.commit()
+            # Recorded by the view buffer's next flush, so the GET itself never writes
+            read_count = blog.read_count or 0
+            if not result.viewed and view_buffer.record(blog_id, current_user_id):
+                read_count += 1
 
             return {
                 "id": blog.id,
                 "title": blog.title,
                 "content": blog.content,
                 "image_url": blog.image_url,
-                "read_count": blog.read_count,
-                "like_count": result.like_count,
-                "dislike_count": result.dislike_count,
+                "image_variants": blog.image_variants,
+                "read_count": read_count,
+                "like_count": blog.like_count,
+                "dislike_count": blog.dislike_count,
+                "my_reaction": None if result.my_reaction is None else ("like" if result.my_reaction else "dislike"),
+                "feedback_count": result.feedback_count,
+                "feedbacks": self._feedback_page(blog_id, current_user_id, page_size=DETAIL_FEEDBACK_PAGE_SIZE),
                 "created_at": blog.created_at,
                 "updated_at": blog.updated_at,
             }
@@ -123,83 +245,98 @@ class BlogService:
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def create_blog(self, author_id: int, title: str, content: str, image: bytes = None):
+    def _discard_image(self, image):
+        """Best-effort removal of a stored ``(image_url, image_variants)`` that no blog points at."""
+        if not image:
+            return
+        try:
+            image_pipeline.delete(self.storage, *image)
+        except Exception as s3_error:
+            logger.error(f"Error deleting unused image from S3: {s3_error}")
+
+
+    def _check_title_available(self, title: str, blog_id: int = None):
+        query = self.db.query(Blog.id).filter(Blog.title == title)
+        if blog_id is not None:
+            query = query.filter(Blog.id != blog_id)
+        if query.first():
+            raise HTTPException(status_code=400, detail="Blog title already exists")
+
+
+    def create_blog(self, author_id: int, title: str, content: str, image_path: str = None):
+        uploaded = None
         try:
             if not re.match(r'^[A-Za-z0-9 ]+$', title) or len(title.strip()) < 4:
                 raise HTTPException(status_code=400, detail="Title must be at least 4 characters and contain only letters and spaces")
             if not content.strip():
                 raise HTTPException(status_code=400, detail="Content must not be empty")
-            if self.db.query(Blog).filter(Blog.title == title).first():
-                raise HTTPException(status_code=400, detail="Blog title already exists")
-            
-            blog = Blog(author_id=author_id, title=title, content=content)
-            if image:
-                if len(image) > 5 * 1024 * 1024:
-                    raise HTTPException(status_code=400, detail="Image too large")
-                try:
-                    img = Image.open(io.BytesIO(image))
-                    img.verify()
-                    format = img.format.lower()
-                    mime_type = f'image/{format}'
-                except UnidentifiedImageError:
-                    raise HTTPException(status_code=400, detail="Uploaded file is not a valid image")
-
-                # Upload to S3
-                image_key = f"blogs/{author_id}/{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
-                self.s3.put_object(
-                    Bucket=AWS_BUCKET_NAME,
-                    Key=image_key,
-                    Body=image,
-                    ContentType=mime_type
-                )
-                blog.image_url = f"https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{image_key}"
+            self._check_title_available(title)
+            if image_path:
+                # No transaction (or pooled connection) is held while the image pool works
+                self.db.rollback()
+                uploaded = image_pipeline.process(self.storage, f"blogs/{author_id}", image_path)
+                self._check_title_available(title)
+
+            blog = Blog(
+                author_id=author_id,
+                title=title,
+                content=content,
+                excerpt=make_excerpt(content),
+                reading_time=estimate_reading_time(content)
+            )
+            if uploaded:
+                blog.image_url, blog.image_variants = uploaded
             self.db.add(blog)
+            self.db.flush()
+            trending.mark(self.db, blog.id)
             self.db.commit()
+            uploaded = None
+            feed_cache.invalidate()
+            counts.invalidate("admin.blogs")
             self.db.refresh(blog)
 
             return {"message": "Blog created successfully", "blog_id": blog.id}
         except HTTPException as e:
+            self.db.rollback()
+            self._discard_image(uploaded)
             logger.warning(f"HTTP error while creating blog: {e.detail}")
             raise e
+        except IntegrityError as e:
+            # Another request took the title after it was checked
+            self.db.rollback()
+            self._discard_image(uploaded)
+            logger.warning(f"Blog title conflict while creating blog: {e}")
+            raise HTTPException(status_code=400, detail="Blog title already exists")
         except SQLAlchemyError as e:
             self.db.rollback()
+            self._discard_image(uploaded)
             logger.error(f"Database error while creating blog: {e}")
             raise HTTPException(status_code=500, detail="Database error occurred")
         except Exception as e:
             self.db.rollback()
+            self._discard_image(uploaded)
             logger.exception(f"Unexpected error while creating blog: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def get_user_blogs(self, author_id: int, page: int = 1, page_size: int = 10):
+    def get_user_blogs(self, author_id: int, page: int = 1, page_size: int = 10, cursor: str = None, fields: str = None):
         try:
-            offset = (page - 1) * page_size
-
-            blogs = (
-                self.db.query(Blog)
+            names = select_fields(fields, USER_BLOG_FIELDS, USER_BLOG_DEFAULT_FIELDS)
+            query = (
+                self.db.query(*query_columns(names, USER_BLOG_FIELDS, required=("id", "created_at")))
                 .filter(Blog.author_id == author_id, Blog.is_deleted == False)
-                .order_by(Blog.created_at.desc())
-                .offset(offset)
-                .limit(page_size)
-                .all()
             )
+            blogs = paginate(query, Blog.created_at, Blog.id, page, page_size, cursor)
+            cursor_for_next_page = next_cursor(blogs, page_size)
 
             return {
                 "page": page,
                 "page_size": page_size,
-                "blogs": [
-                    {
-                        "id": blog.id,
-                        "title": blog.title,
-                        "content": blog.content,
-                        "image_url": blog.image_url,
-                        "read_count": blog.read_count,
-                        "created_at": blog.created_at,
-                        "updated_at": blog.updated_at,
-                    }
-                    for blog in blogs
-                ]
+                "next_cursor": cursor_for_next_page,
+                "blogs": [{name: getattr(blog, name) for name in names} for blog in blogs]
             }
+        except HTTPException as e:
+            raise e
         except SQLAlchemyError as e:
             logger.error(f"Database error in get_user_blogs: {e}")
             raise HTTPException(status_code=500, detail="Database error occurred")
@@ -208,7 +345,8 @@ class BlogService:
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def edit_blog(self, blog_id: int, author_id: int, title: str = None, content: str = None, image: bytes = None):
+    def edit_blog(self, blog_id: int, author_id: int, title: str = None, content: str = None, image_path: str = None):
+        uploaded = None
         try:
             blog = self.db.query(Blog).filter(Blog.id == blog_id, Blog.author_id == author_id).first()
             if not blog:
@@ -216,55 +354,59 @@ class BlogService:
             if title:
                 if not re.match(r'^[A-Za-z0-9 ]+$', title) or len(title.strip()) < 4:
                     raise HTTPException(status_code=400, detail="Title must be at least 4 characters and contain only letters and spaces")
-                if self.db.query(Blog).filter(Blog.title == title, Blog.id != blog_id).first():
-                    raise HTTPException(status_code=400, detail="Blog title already exists")
+                self._check_title_available(title, blog_id)
+            if content and not content.strip():
+                raise HTTPException(status_code=400, detail="Content must not be empty")
+            if image_path:
+                # No transaction (or pooled connection) is held while the image pool works;
+                # the blog is read again afterwards in case it changed meanwhile
+                self.db.rollback()
+                uploaded = image_pipeline.process(self.storage, f"blogs/{author_id}", image_path)
+                blog = self.db.query(Blog).filter(Blog.id == blog_id, Blog.author_id == author_id).first()
+                if not blog:
+                    raise HTTPException(status_code=404, detail="Blog not found or unauthorized")
+                if title:
+                    self._check_title_available(title, blog_id)
+
+            if title:
                 blog.title = title
             if content:
-                if not content.strip():
-                    raise HTTPException(status_code=400, detail="Content must not be empty")
                 blog.content = content
-            if image:
-                if len(image) > 5 * 1024 * 1024:
-                    raise HTTPException(status_code=400, detail="Image too large")
+                blog.excerpt = make_excerpt(content)
+                blog.reading_time = estimate_reading_time(content)
+            replaced = None
+            if uploaded:
                 if blog.image_url:
-                    # Delete old image from S3
-                    try:
-                        image_key = blog.image_url.split(f"{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/")[-1]
-                        self.s3.delete_object(Bucket=AWS_BUCKET_NAME, Key=image_key)
-                    except Exception as s3_error:
-                        logger.error(f"Error deleting old image from S3: {s3_error}")
-                    
-                try:
-                    img = Image.open(io.BytesIO(image))
-                    img.verify()
-                    format = img.format.lower()
-                    mime_type = f'image/{format}'
-                except UnidentifiedImageError:
-                    raise HTTPException(status_code=400, detail="Uploaded file is not a valid image")
-
-                # Upload to S3
-                image_key = f"blogs/{author_id}/{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
-                self.s3.put_object(
-                    Bucket=AWS_BUCKET_NAME,
-                    Key=image_key,
-                    Body=image,
-                    ContentType=mime_type
-                )
-                blog.image_url = f"https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{image_key}"
+                    replaced = (blog.image_url, blog.image_variants)
+                blog.image_url, blog.image_variants = uploaded
             self.db.commit()
+            uploaded = None
+            feed_cache.invalidate()
             self.db.refresh(blog)
+            # Only once the new image is committed, so a failed upload keeps the old one
+            self._discard_image(replaced)
 
             return {"message": "Blog updated successfully"}
         except HTTPException as e:
+            self.db.rollback()
+            self._discard_image(uploaded)
             logger.warning(f"Validation error in edit_blog: {e.detail}")
             raise e
+        except IntegrityError as e:
+            # Another request took the title after it was checked
+            logger.warning(f"Blog title conflict in edit_blog: {e}")
+            self.db.rollback()
+            self._discard_image(uploaded)
+            raise HTTPException(status_code=400, detail="Blog title already exists")
         except SQLAlchemyError as e:
             logger.error(f"Database error in edit_blog: {e}")
             self.db.rollback()
+            self._discard_image(uploaded)
             raise HTTPException(status_code=500, detail="Database error occurred")
         except Exception as e:
             logger.exception(f"Unexpected error in edit_blog: {e}")
             self.db.rollback()
+            self._discard_image(uploaded)
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -278,13 +420,15 @@ class BlogService:
             
             if blog.image_url:
                 try:
-                    image_key = blog.image_url.split(f"{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/")[-1]
-                    self.s3.delete_object(Bucket=AWS_BUCKET_NAME, Key=image_key)
+                    image_pipeline.delete(self.storage, blog.image_url, blog.image_variants)
                 except Exception as s3_error:
                     logger.error(f"Error deleting image from S3: {s3_error}")
 
             blog.is_deleted = True
+            trending.mark(self.db, blog_id)
             self.db.commit()
+            feed_cache.invalidate()
+            counts.invalidate("admin.blogs")
 
             return {"message": "Blog deleted successfully"}
         except HTTPException as e:
@@ -300,32 +444,310 @@ class BlogService:
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def like_or_unlike_blog(self, blog_id: int, user_id: int):
+    def create_image_upload(self, author_id: int, content_type: str):
+        """Presigned POST for uploading a blog image straight to storage; attach it with ``attach_uploaded_image``."""
         try:
-            blog = self.db.query(Blog).filter(Blog.id == blog_id).first()
+            if content_type not in IMAGE_UPLOAD_CONTENT_TYPES:
+                raise HTTPException(status_code=400, detail=f"Unsupported image type; expected one of {', '.join(IMAGE_UPLOAD_CONTENT_TYPES)}")
+            key = f"{UPLOAD_PREFIX}/{author_id}/{uuid.uuid4().hex}"
+            upload = run_blocking(
+                self.storage.presign_upload, key, content_type, IMAGE_MAX_BYTES, IMAGE_UPLOAD_EXPIRES_SECONDS,
+                {"author-id": str(author_id)}
+            )
+
+            return {
+                "key": key,
+                "url": upload["url"],
+                "fields": upload["fields"],
+                "max_bytes": IMAGE_MAX_BYTES,
+                "expires_in": IMAGE_UPLOAD_EXPIRES_SECONDS
+            }
+        except HTTPException as e:
+            logger.warning(f"Validation error in create_image_upload: {e.detail}")
+            raise e
+        except Exception as e:
+            logger.exception(f"Unexpected error in create_image_upload: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+
+    def attach_uploaded_image(self, blog_id: int, author_id: int, key: str):
+        """Attach a finished direct upload to a blog after checking the stored object's head.
+
+        Only the object's metadata is read here; the variants are derived
+        later by ``derive_uploaded_images``.
+        """
+        try:
+            blog = self.db.query(Blog).filter(Blog.id == blog_id, Blog.author_id == author_id, Blog.is_deleted == False).first()
             if not blog:
-                raise HTTPException(status_code=404, detail="Blog not found")
+                raise HTTPException(status_code=404, detail="Blog not found or unauthorized")
+            if not key.startswith(f"{UPLOAD_PREFIX}/{author_id}/"):
+                raise HTTPException(status_code=400, detail="Upload not found")
+            head = run_blocking(self.storage.head, key)
+            if head is None:
+                raise HTTPException(status_code=400, detail="Upload not found")
+            # The presigned policy enforces these; checked again in case the object was written another way
+            if head["metadata"].get("author-id") != str(author_id):
+                raise HTTPException(status_code=400, detail="Upload not found")
+            if head["content_type"] not in IMAGE_UPLOAD_CONTENT_TYPES:
+                raise HTTPException(status_code=400, detail="Unsupported image type")
+            if not 0 < head["size"] <= IMAGE_MAX_BYTES:
+                raise HTTPException(status_code=400, detail="Image too large")
+
+            replaced = (blog.image_url, blog.image_variants) if blog.image_url else None
+            blog.image_url = self.storage.url(key)
+            blog.image_variants = None
+            blog.image_claimed_until = None
+            blog.image_attempts = 0
+            self.db.commit()
+            feed_cache.invalidate()
+            self._discard_image(replaced)
+
+            return {"message": "Image attached successfully", "image_url": blog.image_url}
+        except HTTPException as e:
+            logger.warning(f"Validation error in attach_uploaded_image: {e.detail}")
+            raise e
+        except SQLAlchemyError as e:
+            logger.error(f"Database error in attach_uploaded_image: {e}")
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail="Database error occurred")
+        except Exception as e:
+            logger.exception(f"Unexpected error in attach_uploaded_image: {e}")
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+
+    def _claim_uploads(self, batch_size: int):
+        """Lease up to ``batch_size`` pending uploads to this run and count the attempt; commits.
+
+        Workers skip rows another run has claimed (and, on PostgreSQL, rows it
+        is claiming right now) until the lease runs out, so a run that dies
+        mid-batch only delays its blogs.
+        """
+        now = datetime.now(timezone.utc)
+        claimable = (
+            select(Blog.id)
+            .where(
+                Blog.image_url != None, Blog.image_variants == None, Blog.is_deleted == False,
+                Blog.image_url.startswith(self.storage.url(f"{UPLOAD_PREFIX}/")),
+                (Blog.image_claimed_until == None) | (Blog.image_claimed_until <= now),
+            )
+            .order_by(Blog.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        claimed = self.db.execute(
+            update(Blog)
+            .where(Blog.id.in_(claimable))
+            .values(image_claimed_until=now + timedelta(seconds=IMAGE_UPLOAD_DERIVE_LEASE_SECONDS), image_attempts=Blog.image_attempts + 1)
+            .returning(Blog.id, Blog.author_id, Blog.image_url, Blog.image_attempts)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.db.commit()
+        return sorted(claimed, key=lambda row: row.id)
+
+
+    def _release_uploads(self, claimed: list, retry: bool = True):
+        """Hand claimed uploads back for the next run; ``retry=False`` when the attempt should not count."""
+        values = {"image_claimed_until": None}
+        if not retry:
+            values["image_attempts"] = Blog.image_attempts - 1
+        for row in claimed:
+            self.db.execute(
+                update(Blog)
+                .where(Blog.id == row.id, Blog.image_url == row.image_url, Blog.image_variants == None)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        self.db.commit()
+
+
+    def _finish_upload(self, blog_id: int, original: str, image_url: str, image_variants: dict):
+        """Swap a pending upload for its result unless the blog's image changed meanwhile; True if swapped."""
+        result = self.db.execute(
+            update(Blog)
+            .where(Blog.id == blog_id, Blog.image_url == original, Blog.image_variants == None)
+            .values(image_url=image_url, image_variants=image_variants, image_claimed_until=None, image_attempts=0)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+
+    def derive_uploaded_images(self, batch_size: int = 20):
+        """Periodic job: replace attached direct uploads with their variants.
+
+        Every worker runs it; each run leases its batch on the blog rows
+        (``image_claimed_until``), so workers never process the same upload
+        at once. The user may attach another image meanwhile, so the result
+        is written only if the blog still points at the same upload;
+        otherwise the new variants are deleted. An upload that cannot be
+        decoded, has disappeared, or has been attempted
+        ``IMAGE_UPLOAD_DERIVE_MAX_ATTEMPTS`` times (counted on the row, so
+        crashes count too) is detached from its blog.
+
+        This runs in the web workers: the original is downloaded to a temp
+        file there and only the resizing goes to the image process pool. It
+        is not triggered by storage events.
+        """
+        claimed = self._claim_uploads(batch_size)
+
+        derived = 0
+        for index, row in enumerate(claimed):
+            key = self.storage.key_for_url(row.image_url)
+            result = None
+            try:
+                if row.image_attempts > IMAGE_UPLOAD_DERIVE_MAX_ATTEMPTS:
+                    # Earlier runs died while holding it, for instance killed by a huge image
+                    raise HTTPException(status_code=400, detail=f"gave up after {row.image_attempts - 1} attempts")
+                if self.storage.head(key) is None:
+                    raise HTTPException(status_code=400, detail="Upload not found")
+                result = image_pipeline.process_stored(self.storage, f"blogs/{row.author_id}", key)
+                image_url, image_variants = result
+            except HTTPException as e:
+                if e.status_code != 400:
+                    # The image pool is saturated; the rest of the batch waits for the next run
+                    logger.warning(f"Deriving image variants deferred: {e.detail}")
+                    self._release_uploads(claimed[index:], retry=False)
+                    break
+                logger.warning(f"Blog {row.id}: detaching unusable upload {row.image_url}: {e.detail}")
+                image_url, image_variants = None, None
+            except Exception as e:
+                if row.image_attempts < IMAGE_UPLOAD_DERIVE_MAX_ATTEMPTS:
+                    logger.error(f"Blog {row.id}: deriving image variants failed (attempt {row.image_attempts}): {e}")
+                    try:
+                        self._release_uploads([row])
+                    except SQLAlchemyError as db_error:
+                        # The lease runs out on its own
+                        self.db.rollback()
+                        logger.error(f"Database error while releasing blog {row.id}: {db_error}")
+                    continue
+                logger.error(f"Blog {row.id}: detaching upload {row.image_url} after {row.image_attempts} failed attempts: {e}")
+                image_url, image_variants = None, None
+
+            try:
+                swapped = self._finish_upload(row.id, row.image_url, image_url, image_variants)
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                logger.error(f"Database error while storing image variants for blog {row.id}: {e}")
+                self._discard_image(result)
+                continue
+            if not swapped:
+                # The author replaced or removed the image meanwhile
+                self._discard_image(result)
+                continue
+            derived += 1
+            try:
+                self.storage.delete(key)
+            except Exception as s3_error:
+                logger.error(f"Error deleting upload from S3: {s3_error}")
+
+        if derived:
+            feed_cache.invalidate()
+        return derived
+
+
+    def clean_orphan_uploads(self, max_age_seconds: int):
+        """Periodic job: delete direct uploads older than ``max_age_seconds`` that no blog points at.
+
+        Covers uploads that were never attached (abandoned forms, rejected
+        attach calls). Attached uploads are kept until their variants replace
+        them. Returns the number of objects deleted.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+        stale = [key for key, modified_at in self.storage.list(f"{UPLOAD_PREFIX}/") if modified_at < cutoff]
+        deleted = 0
+        for offset in range(0, len(stale), 500):
+            keys = stale[offset:offset + 500]
+            urls = {self.storage.url(key): key for key in keys}
+            attached = set(self.db.execute(
+                select(Blog.image_url)
+                .where(Blog.image_url != None, Blog.image_variants == None, Blog.is_deleted == False, Blog.image_url.in_(urls))
+            ).scalars())
+            self.db.rollback()
+            for url, key in urls.items():
+                if url in attached:
+                    continue
+                try:
+                    self.storage.delete(key)
+                    deleted += 1
+                except Exception as s3_error:
+                    logger.error(f"Error deleting orphaned upload {key} from S3: {s3_error}")
+        if deleted:
+            logger.info(f"Deleted {deleted} direct uploads never attached to a blog")
+        return deleted
+
+
+    def _toggle_reaction_sequential(self, blog_id: int, user_id: int, is_like: bool):
+        # SQLite has no xmax, so the same steps run as separate statements; SQLite
+        # serializes writers, so they still apply atomically
+        now = datetime.now(timezone.utc)
+        reaction = (Like.blog_id == blog_id, Like.user_id == user_id)
+        removed = self.db.execute(delete(Like).where(*reaction, Like.is_like == is_like).returning(Like.id)).first() is not None
+        inserted = flipped = False
+        if not removed:
+            inserted = self.db.execute(
+                dialect_insert(self.db, Like)
+                .values(blog_id=blog_id, user_id=user_id, is_like=is_like, created_at=now, updated_at=now)
+                .on_conflict_do_nothing(index_elements=["user_id", "blog_id"])
+                .returning(Like.id)
+            ).first() is not None
+        if not removed and not inserted:
+            flipped = self.db.execute(
+                update(Like).where(*reaction, Like.is_like != is_like).values(is_like=is_like, updated_at=now).returning(Like.id)
+            ).first() is not None
+
+        delta = int(inserted) + int(flipped) - int(removed)
+        counts = self.db.execute(
+            update(Blog)
+            .where(Blog.id == blog_id)
+            .values(
+                like_count=Blog.like_count + (delta if is_like else -int(flipped)),
+                dislike_count=Blog.dislike_count + (-int(flipped) if is_like else delta)
+            )
+            .returning(Blog.like_count, Blog.dislike_count)
+        ).first()
+        if counts is None:
+            return None
+        return ReactionChange(counts.like_count, counts.dislike_count, removed, inserted, flipped)
+
+
+    def _toggle_reaction(self, blog_id: int, user_id: int, is_like: bool):
+        if self.db.get_bind().dialect.name == "postgresql":
+            change = self.db.execute(TOGGLE_REACTION_SQL, {"blog_id": blog_id, "user_id": user_id, "is_like": is_like}).first()
+        else:
+            change = self._toggle_reaction_sequential(blog_id, user_id, is_like)
+        if change is None:
+            self.db.rollback()
+            raise HTTPException(status_code=404, detail="Blog not found")
+        changed = change.removed or change.inserted or change.flipped
+        if changed:
+            trending.mark(self.db, blog_id)
+        self.db.commit()
+        if changed:
+            feed_cache.counts_changed()
+        return change
+
 
-            existing_like = self.db.query(Like).filter(Like.blog_id == blog_id, Like.user_id == user_id).first()
-
-            if existing_like:
-                if existing_like.is_like:
-                    self.db.delete(existing_like)  # Unlike (remove the like)
-                    self.db.commit()
-                    return {"message": "Blog unliked"}
-                else:
-                    existing_like.is_like = True  # Change dislike to like
-                    existing_like.updated_at = datetime.now(timezone.utc)
-                    self.db.commit()
-                    self.db.refresh(existing_like)
-                    return {"message": "Blog liked"}
+    def _reaction_response(self, message: str, change, is_like: bool):
+        return {
+            "message": message,
+            "like_count": change.like_count,
+            "dislike_count": change.dislike_count,
+            "my_reaction": None if change.removed else ("like" if is_like else "dislike"),
+        }
+
+
+    def like_or_unlike_blog(self, blog_id: int, user_id: int):
+        try:
+            change = self._toggle_reaction(blog_id, user_id, True)
+            if change.removed:
+                message = "Blog unliked"
+            elif change.inserted:
+                message = "Blog liked successfully"
             else:
-                new_like = Like(blog_id=blog_id, user_id=user_id, is_like=True)
-                self.db.add(new_like)
-                self.db.commit()
-                self.db.refresh(new_like)
-        
-                return {"message": "Blog liked successfully"}
+                message = "Blog liked"  # Changed dislike to like
+            return self._reaction_response(message, change, True)
         except HTTPException as e:
             logger.warning(f"Validation error in like_or_unlike_blog: {e.detail}")
             raise e
@@ -341,30 +763,14 @@ class BlogService:
 
     def dislike_or_undislike_blog(self, blog_id: int, user_id: int):
         try:
-            blog = self.db.query(Blog).filter(Blog.id == blog_id).first()
-            if not blog:
-                raise HTTPException(status_code=404, detail="Blog not found")
-
-            existing_dislike = self.db.query(Like).filter(Like.blog_id == blog_id, Like.user_id == user_id).first()
-
-            if existing_dislike:
-                if existing_dislike.is_like:
-                    existing_dislike.is_like = False  # Change like to dislike
-                    existing_dislike.updated_at = datetime.now(timezone.utc)
-                    self.db.commit()
-                    self.db.refresh(existing_dislike)
-                    return {"message": "Blog disliked"}
-                else:
-                    self.db.delete(existing_dislike)  # Dislike (remove the like)
-                    self.db.commit()
-                    return {"message": "Blog undisliked"}
+            change = self._toggle_reaction(blog_id, user_id, False)
+            if change.removed:
+                message = "Blog undisliked"
+            elif change.inserted:
+                message = "Blog disliked successfully"
             else:
-                new_dislike = Like(blog_id=blog_id, user_id=user_id, is_like=False)
-                self.db.add(new_dislike)
-                self.db.commit()
-                self.db.refresh(new_dislike)
-
-                return {"message": "Blog disliked successfully"}
+                message = "Blog disliked"  # Changed like to dislike
+            return self._reaction_response(message, change, False)
         except HTTPException as e:
             logger.warning(f"Validation error in dislike_or_undislike_blog: {e.detail}")
             raise e
@@ -378,42 +784,53 @@ class BlogService:
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def get_feedbacks(self, blog_id: int, current_user: User, page: int = 1, page_size: int = 10):
+    def _feedback_page(self, blog_id: int, current_user: int, page: int = 1, page_size: int = 10, cursor: str = None):
+        query = (
+            self.db.query(
+                Feedback.id,
+                Feedback.user_id,
+                Feedback.comment,
+                Feedback.is_listed,
+                Feedback.created_at,
+                Feedback.updated_at,
+                User.full_name.label("username")
+            )
+            .outerjoin(User, User.id == Feedback.user_id)
+            .filter(
+                Feedback.blog_id == blog_id,
+                Feedback.is_deleted == False,
+                Feedback.is_listed == True
+            )
+        )
+        feedbacks = paginate(query, Feedback.created_at, Feedback.id, page, page_size, cursor)
+        cursor_for_next_page = next_cursor(feedbacks, page_size)
+
+        return {
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": cursor_for_next_page,
+            "blogs": [
+                {
+                    "id": feedback.id,
+                    "is_current_user_feedback": feedback.user_id == current_user,
+                    "username": feedback.username,
+                    "comment": feedback.comment,
+                    "is_listed": feedback.is_listed,
+                    "created_at": feedback.created_at,
+                    "updated_at": feedback.updated_at
+                }
+                for feedback in feedbacks
+            ]
+        }
+
+
+    def get_feedbacks(self, blog_id: int, current_user: User, page: int = 1, page_size: int = 10, cursor: str = None):
         try:
             blog = self.db.query(Blog).filter(Blog.id == blog_id).first()
             if not blog:
                 raise HTTPException(status_code=404, detail="Blog not found")
-            offset = (page - 1) * page_size
-
-            feedbacks = (
-                self.db.query(Feedback)
-                .filter(
-                    Feedback.blog_id == blog_id,
-                    Feedback.is_deleted == False,
-                    Feedback.is_listed == True
-                )
-                .order_by(Feedback.created_at.desc())
-                .offset(offset)
-                .limit(page_size)
-                .all()
-            )
 
-            return {
-                "page": page,
-                "page_size": page_size,
-                "blogs": [
-                    {
-                        "id": feedback.id,
-                        "is_current_user_feedback": feedback.user_id == current_user,
-                        "username": self.db.query(User).filter(User.id == feedback.user_id).first().full_name,
-                        "comment": feedback.comment,
-                        "is_listed": feedback.is_listed,
-                        "created_at": feedback.created_at,
-                        "updated_at": feedback.updated_at
-                    }
-                    for feedback in feedbacks
-                ]
-            }
+            return self._feedback_page(blog_id, current_user, page, page_size, cursor)
         except HTTPException as e:
             logger.warning(f"Validation error in get_feedbacks: {e.detail}")
             raise e
@@ -440,7 +857,9 @@ class BlogService:
 
             new_feedback = Feedback(blog_id=blog_id, user_id=user_id, comment=comment)
             self.db.add(new_feedback)
+            trending.mark(self.db, blog_id)
             self.db.commit()
+            counts.invalidate(("admin.feedbacks", blog_id))
             self.db.refresh(new_feedback)
 
             return {"message": "Feedback created successfully", "feedback_id": new_feedback.id}
@@ -492,7 +911,9 @@ class BlogService:
 
             feedback.is_deleted = True
             feedback.updated_at = datetime.now(timezone.utc)
+            trending.mark(self.db, feedback.blog_id)
             self.db.commit()
+            counts.invalidate(("admin.feedbacks", feedback.blog_id))
 
             return {"message": "Feedback deleted successfully"}
         except HTTPException as e:
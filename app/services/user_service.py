@@ -1,19 +1,21 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from passlib.context import CryptContext
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from app.core.config import SECRET_KEY
+from sqlalchemy import update
+from app.core.security import access_token_expires, refresh_token_expires, issue_tokens, decode_token
+from app.core.principals import invalidate_principal
+from app.core.passwords import password_hasher
 from app.models.user import User
-from app.models.logout import Logout
+from app.models.revoked_token import RevokedToken
+from app.core.token_cache import revoked_tokens
+from app.core.counts import counts
+from app.db.dialect import dialect_insert
 import jwt, logging, re
 
 
 logger = logging.getLogger(__name__)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-access_token_expires = timedelta(minutes=15)
-refresh_token_expires = timedelta(days=30)
 
 class UserService:
     def __init__(self, db: Session):
@@ -37,7 +39,7 @@ class UserService:
             if db_user:
                 raise HTTPException(status_code=400, detail="Email already registered")
 
-            hashed_password = pwd_context.hash(user_data["password"])
+            hashed_password = password_hasher.hash(user_data["password"])
             new_user = User(
                 full_name=user_data["full_name"],
                 email=user_data["email"],
@@ -46,6 +48,7 @@ class UserService:
             )
             self.db.add(new_user)
             self.db.commit()
+            counts.invalidate("admin.users")
             self.db.refresh(new_user)
 
             return {"message": "User registered successfully"}
@@ -66,22 +69,13 @@ class UserService:
     def login_user(self, email: str, password: str):
         try:
             db_user = self.db.query(User).filter(User.email == email).first()
-            if not db_user or not pwd_context.verify(password, db_user.password):
+            if not db_user or not password_hasher.verify(password, db_user.password):
                 raise HTTPException(status_code=401, detail="Invalid credentials")
             if db_user.is_blocked:
                 raise HTTPException(status_code=403, detail="Account is blocked, please contact support!")
 
             # Generate token
-            access_token = jwt.encode(
-                {"sub": db_user.email, "id": db_user.id, "exp": datetime.now(timezone.utc) + access_token_expires},
-                SECRET_KEY,
-                algorithm="HS256"
-            )
-            refresh_token = jwt.encode(
-                {"sub": db_user.email, "id": db_user.id, "type": "refresh", "exp": datetime.now(timezone.utc) + refresh_token_expires},
-                SECRET_KEY,
-                algorithm="HS256"
-            )
+            access_token, refresh_token = issue_tokens(db_user)
 
             response = JSONResponse(content={"message": "Login successful"})
             response.set_cookie(key="access_token", value=access_token, httponly=True, max_age=access_token_expires, samesite="Lax", secure=False)
@@ -99,58 +93,93 @@ class UserService:
             raise HTTPException(status_code=500, detail="Internal server error")
 
 
-    def logout_user(self, access_token: str, refresh_token: str, db: Session, user_id):
+    def logout_user(self, access_token: str, refresh_token: str, user_id: int):
         try:
-            revoked_access_token = Logout(token=access_token)
-            revoked_refresh_token = Logout(token=refresh_token)
-            db.add(revoked_access_token)
-            db.add(revoked_refresh_token)
-            db.commit()
+            revoked = []
+            for token in (access_token, refresh_token):
+                if not token:
+                    continue
+                # An expired token still has to be revoked if its signature is valid
+                payload = decode_token(token, verify_exp=False)
+                if payload.get("id") != user_id:
+                    raise HTTPException(status_code=401, detail="Invalid token")
+                revoked.append((payload["jti"], payload["exp"]))
+
+            if revoked:
+                # A retried logout (or both cookies carrying the same token) must not trip the unique jti
+                self.db.execute(
+                    dialect_insert(self.db, RevokedToken)
+                    .values([
+                        {"jti": jti, "user_id": user_id, "expires_at": datetime.fromtimestamp(exp, tz=timezone.utc)}
+                        for jti, exp in revoked
+                    ])
+                    .on_conflict_do_nothing(index_elements=["jti"])
+                )
+            self.db.commit()
+            for jti, exp in revoked:
+                revoked_tokens.revoke(jti, exp)
 
             return {"message": "Logged out successfully"}
         except HTTPException as e:
             raise e
-        except jwt.ExpiredSignatureError:
-            raise HTTPException(status_code=401, detail="Token expired")
         except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail="Invalid token")
         except Exception as e:
-            db.rollback()
+            self.db.rollback()
             logger.exception(f"Unexpected error during logout: {e}")
             raise HTTPException(status_code=500, detail=f"Logout failed")
 
 
-    def refresh_token(self, token_str: str, db: Session):
+    def logout_all_sessions(self, user_id: int):
+        try:
+            email = self.db.execute(
+                update(User).where(User.id == user_id).values(token_version=User.token_version + 1).returning(User.email)
+            ).scalar()
+            if not email:
+                raise HTTPException(status_code=404, detail="User not found")
+            invalidate_principal(self.db, email)
+            self.db.commit()
+
+            response = JSONResponse(content={"message": "Logged out from all sessions"})
+            response.delete_cookie("access_token")
+            response.delete_cookie("refresh_token")
+
+            return response
+        except HTTPException as e:
+            raise e
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error during logout from all sessions for user ID {user_id}: {e}")
+            raise HTTPException(status_code=500, detail="Database error occurred")
+        except Exception as e:
+            self.db.rollback()
+            logger.exception(f"Unexpected error during logout from all sessions for user ID {user_id}: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+
+    def refresh_token(self, token_str: str):
         try:
             # Verify refresh token
-            payload = jwt.decode(token_str, SECRET_KEY, algorithms=["HS256"])
+            payload = decode_token(token_str)
             email = payload.get("sub")
             if not email:
                 raise HTTPException(status_code=401, detail="Invalid refresh token")
-            token_entry = db.query(Logout).filter(Logout.token == token_str).first()
-            if token_entry:
+            if revoked_tokens.is_revoked(self.db, payload["jti"], payload["exp"]):
                 raise HTTPException(status_code=401, detail="Unauthorized!")
             exp_timestamp = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
             if exp_timestamp < datetime.now(timezone.utc):
                 raise HTTPException(status_code=401, detail="Refresh token expired")
 
-            user = db.query(User).filter(User.email == email).first()
+            user = self.db.query(User).filter(User.email == email).first()
             if not user:
                 raise HTTPException(status_code=401, detail="User not found")
+            if payload["ver"] != user.token_version:
+                raise HTTPException(status_code=401, detail="Unauthorized!")
             if user.is_blocked:
                 raise HTTPException(status_code=403, detail="Account is blocked")
 
             # Generate new token
-            new_access_token = jwt.encode(
-                {"sub": user.email, "id": user.id, "exp": datetime.now(timezone.utc) + access_token_expires},
-                SECRET_KEY,
-                algorithm="HS256"
-            )
-            new_refresh_token = jwt.encode(
-                {"sub": user.email, "id": user.id, "type": "refresh", "exp": datetime.now(timezone.utc) + refresh_token_expires},
-                SECRET_KEY,
-                algorithm="HS256"
-            )
+            new_access_token, new_refresh_token = issue_tokens(user)
 
             response = JSONResponse(content={"message": "Token refreshed successfully"})
             response.set_cookie(key="access_token", value=new_access_token, httponly=True, max_age=access_token_expires, secure=False, samesite="lax")
@@ -164,11 +193,27 @@ class UserService:
         except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail="Invalid refresh token")
         except SQLAlchemyError as e:
-            db.rollback()
+            self.db.rollback()
             logger.error(f"Database error during token refresh: {e}")
             raise HTTPException(status_code=500, detail="Database error occurred")
         except Exception as e:
-            db.rollback()
+            self.db.rollback()
             logger.exception(f"Unexpected error during token refresh: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
+
+    def purge_expired_revocations(self):
+        try:
+            purged = (
+                self.db.query(RevokedToken)
+                .filter(RevokedToken.expires_at <= datetime.now(timezone.utc))
+                .delete(synchronize_session=False)
+            )
+            self.db.commit()
+            if purged:
+                logger.info(f"Purged {purged} expired token revocations")
+            return purged
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error while purging expired token revocations: {e}")
+            raise
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.templating import Jinja2Templates
 from app.core.config import BASE_URL
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 import jwt
-from app.models.logout import Logout
-from app.db.database import get_db
+from app.dependencies import authenticate
+from app.db.database import get_db, run_with_session
 
 
 router = APIRouter()
@@ -17,9 +17,10 @@ async def get_admin_login_page(request: Request,   db: Session = Depends(get_db)
     
     if token:
         try:
-            revoked_token = db.query(Logout).filter(Logout.token == token).first()
-            if not revoked_token:
-                return RedirectResponse(url=f"{BASE_URL}/admin/dashboard/")
+            await run_with_session(db, lambda session: authenticate(token, session))
+            return RedirectResponse(url=f"{BASE_URL}/admin/dashboard/")
+        except HTTPException:
+            pass
         except jwt.ExpiredSignatureError:
             pass
         except jwt.InvalidTokenError:
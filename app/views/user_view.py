@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 import jwt
-from app.models.logout import Logout
+from app.dependencies import authenticate
 from app.core.config import BASE_URL
 from app.db.database import get_db
 
@@ -17,9 +17,10 @@ def get_login_page(request: Request,  db: Session = Depends(get_db)):
     
     if token:
         try:
-            revoked_token = db.query(Logout).filter(Logout.token == token).first()
-            if not revoked_token:
-                return RedirectResponse(url=f"{BASE_URL}/user/landing/")
+            authenticate(token, db)
+            return RedirectResponse(url=f"{BASE_URL}/user/landing/")
+        except HTTPException:
+            pass
         except jwt.ExpiredSignatureError:
             pass
         except jwt.InvalidTokenError:
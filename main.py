@@ -1,5 +1,24 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import (
+    REVOCATION_PURGE_SECONDS, VIEW_FLUSH_SECONDS, TRENDING_REFRESH_SECONDS, TRENDING_REBUILD_SECONDS,
+    IMAGE_UPLOAD_DERIVE_SECONDS, IMAGE_UPLOAD_DERIVE_BATCH_SIZE, IMAGE_UPLOAD_ORPHAN_SECONDS, IMAGE_UPLOAD_CLEANUP_SECONDS,
+    DEBUG, LOOP_LAG_THRESHOLD_MS, DB_POOL_WARM_UP, REQUEST_THREADS
+)
+from app.core.concurrency import start_loop_monitor, size_threadpool
+from app.core.jobs import register_job, run_job, start_jobs, stop_jobs
+from app.core.passwords import password_hasher
+from app.core.images import image_pipeline
+from app.core.principals import principal_listener
+from app.core.uploads import UploadSizeLimit
+from app.core.view_buffer import view_buffer
+from app.core.trending import trending
+from app.core.token_cache import revoked_tokens
+from app.db.database import engine, warm_up_pools, pin_to_primary
+from app.services.user_service import UserService
+from app.services.blog_service import BlogService
 from app.api.auth import router
 from app.api.blog import router as blog_router
 from app.api.admin import router as admin_router
@@ -8,7 +27,39 @@ from app.views.admin_view import router as admin_view_router
 from fastapi.staticfiles import StaticFiles
 
 
-app = FastAPI()
+register_job("purge_expired_revocations", REVOCATION_PURGE_SECONDS, lambda db: UserService(db).purge_expired_revocations())
+register_job("flush_views", VIEW_FLUSH_SECONDS, view_buffer.flush)
+register_job("refresh_trending", TRENDING_REFRESH_SECONDS, trending.refresh)
+register_job("rebuild_trending", TRENDING_REBUILD_SECONDS, trending.rebuild, leased=True)
+register_job("derive_uploaded_images", IMAGE_UPLOAD_DERIVE_SECONDS, lambda db: BlogService(db).derive_uploaded_images(IMAGE_UPLOAD_DERIVE_BATCH_SIZE))
+register_job("clean_orphan_uploads", IMAGE_UPLOAD_CLEANUP_SECONDS, lambda db: BlogService(db).clean_orphan_uploads(IMAGE_UPLOAD_ORPHAN_SECONDS), leased=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    size_threadpool(REQUEST_THREADS, password_hasher, image_pipeline)
+    if DB_POOL_WARM_UP:
+        await warm_up_pools()
+    # Load the revocation cache off the request path; requests fall back to lookups until it is ready
+    await run_in_threadpool(run_job, "sync_revocations", revoked_tokens.sync)
+    password_hasher.start()
+    image_pipeline.start()
+    principal_listener.start(engine)
+    start_jobs()
+    loop_monitor = start_loop_monitor(LOOP_LAG_THRESHOLD_MS / 1000) if DEBUG else None
+    yield
+    if loop_monitor:
+        loop_monitor.cancel()
+    await stop_jobs()
+    # Views still queued in memory would otherwise be lost on restart
+    await run_in_threadpool(run_job, "flush_views", view_buffer.flush)
+    password_hasher.shutdown()
+    image_pipeline.shutdown()
+    principal_listener.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(UploadSizeLimit)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -16,6 +67,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        pin_to_primary(response)
+    return response
+
+
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 
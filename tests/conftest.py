@@ -0,0 +1,68 @@
+"""Shared fixtures: a throwaway SQLite database per test, or PostgreSQL when TEST_DATABASE_URL is set.
+
+The settings the app reads at import time are filled with test values first,
+so the suite runs without a .env file.
+"""
+import os, tempfile
+
+_handle, _app_database = tempfile.mkstemp(prefix="app-", suffix=".db")
+os.close(_handle)
+for name, value in {
+    "DATABASE_URL": f"sqlite:///{_app_database}",
+    "SECRET_KEY": "test-secret",
+    "AWS_ACCESS_KEY": "test",
+    "AWS_SECRET_KEY": "test",
+    "AWS_REGION_NAME": "us-east-1",
+    "AWS_BUCKET_NAME": "test",
+    "BASE_URL": "http://testserver",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+import app.models.user, app.models.blog, app.models.feedback, app.models.revoked_token, app.models.trending, app.models.job_lease  # noqa: F401 - registers the tables for create_all
+
+
+def pytest_sessionfinish(session, exitstatus):
+    os.remove(_app_database)
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def postgres_engine():
+    """A scratch PostgreSQL database from TEST_DATABASE_URL; its tables are dropped after each test, so never point it at a live one."""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url or not url.startswith("postgresql"):
+        pytest.skip("TEST_DATABASE_URL does not point at PostgreSQL")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def engine(request):
+    """Runs the test once per backend; the PostgreSQL run exercises the single-statement SQL paths."""
+    return request.getfixturevalue(f"{request.param}_engine")
+
+
+@pytest.fixture
+def Session(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def sqlite_db(sqlite_engine):
+    db = sessionmaker(bind=sqlite_engine, autoflush=False)()
+    yield db
+    db.close()
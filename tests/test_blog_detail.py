@@ -0,0 +1,20 @@
+from app.commands.benchmark_blog_detail import seed
+from app.commands.check_query_plans import StatementLog
+from app.services.blog_service import DETAIL_FEEDBACK_PAGE_SIZE, BlogService
+import pytest
+
+
+@pytest.mark.parametrize("feedbacks, likes", [(3, 5), (200, 600)])
+def test_detail_query_count_is_constant(sqlite_engine, sqlite_db, feedbacks, likes):
+    blog_id, viewer_id = seed(sqlite_db, feedbacks, likes)
+    detail = {}
+    statements = StatementLog(sqlite_engine).capture(
+        lambda: detail.update(BlogService(sqlite_db).view_blog_detail(blog_id, viewer_id))
+    )
+
+    # One statement for the post with its aggregates, one for the first feedback page
+    assert len(statements) == 2, [" ".join(statement.split())[:120] for statement, _ in statements]
+    liked = sum(1 for i in range(likes) if i % 4 != 0)
+    assert (detail["like_count"], detail["dislike_count"], detail["feedback_count"]) == (liked, likes - liked, feedbacks)
+    assert detail["my_reaction"] == ("like" if (likes - 1) % 4 else "dislike")
+    assert len(detail["feedbacks"]["blogs"]) == min(feedbacks, DETAIL_FEEDBACK_PAGE_SIZE)
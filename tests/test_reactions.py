@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from sqlalchemy import func
+from app.commands.stress_reactions import seed, worker
+from app.models.blog import Blog
+from app.models.feedback import Like
+from app.services.blog_service import BlogService
+import pytest
+
+
+def stored_counts(db, blog_id: int):
+    blog = db.query(Blog.like_count, Blog.dislike_count).filter(Blog.id == blog_id).one()
+    likes = db.query(func.count(Like.id)).filter(Like.blog_id == blog_id, Like.is_like == True).scalar()
+    dislikes = db.query(func.count(Like.id)).filter(Like.blog_id == blog_id, Like.is_like == False).scalar()
+    return (blog.like_count, blog.dislike_count), (likes, dislikes)
+
+
+def test_toggle_sequence(Session):
+    db = Session()
+    try:
+        blog_id, (user_id, other_id, *_) = seed(db, 2)
+        service = BlogService(db)
+
+        liked = service.like_or_unlike_blog(blog_id, user_id)
+        assert (liked["like_count"], liked["dislike_count"], liked["my_reaction"]) == (1, 0, "like")
+        service.like_or_unlike_blog(blog_id, other_id)
+        flipped = service.dislike_or_undislike_blog(blog_id, user_id)
+        assert (flipped["message"], flipped["like_count"], flipped["dislike_count"]) == ("Blog disliked", 1, 1)
+        removed = service.dislike_or_undislike_blog(blog_id, user_id)
+        assert (removed["like_count"], removed["dislike_count"], removed["my_reaction"]) == (1, 0, None)
+
+        counters, rows = stored_counts(db, blog_id)
+        assert counters == rows == (1, 0)
+    finally:
+        db.close()
+
+
+def test_toggle_missing_blog(Session):
+    db = Session()
+    try:
+        _, user_ids = seed(db, 1)
+        with pytest.raises(HTTPException) as error:
+            BlogService(db).like_or_unlike_blog(-1, user_ids[0])
+        assert error.value.status_code == 404
+    finally:
+        db.close()
+
+
+def test_concurrent_toggles_keep_counters_in_sync(Session):
+    db = Session()
+    try:
+        blog_id, user_ids = seed(db, 4)
+    finally:
+        db.close()
+
+    threads = 8
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        failures = sum(pool.map(lambda i: worker(Session, blog_id, user_ids, 40, i), range(threads)))
+
+    db = Session()
+    try:
+        counters, rows = stored_counts(db, blog_id)
+    finally:
+        db.close()
+    assert failures == 0
+    assert counters == rows